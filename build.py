@@ -4,11 +4,69 @@ Build script to package Tetris game into standalone executables.
 Creates executables for Windows, macOS, and Linux.
 """
 
+import argparse
 import os
 import sys
 import platform
 import subprocess
 import shutil
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+
+
+# PyInstaller keeps its analysis and binary caches here between builds
+PYINSTALLER_CACHE_DIR = '.pyinstaller-cache'
+
+# Game packages bundled into every executable
+PACKAGES = ['game_logic', 'rendering', 'networking']
+
+# Unused modules kept out of the bundle (less to unpack on every launch)
+EXCLUDED_MODULES = [
+    'tkinter',
+    'unittest',
+    'pydoc',
+    'distutils',
+    'test',
+    'numpy.tests',
+    'pygame.tests',
+    'pygame.examples',
+    'pygame.docs',
+]
+
+# PyInstaller settings per build target
+MODE_CONFIGS = {
+    'launcher': {
+        'name': 'Tetris_Launcher',
+        'bundle': '--onedir',  # Changed from --onefile to fix macOS issues
+        'script': 'launcher.py',
+        'hidden_imports': [
+            'game_logic.pieces',
+            'game_logic.board',
+            'game_logic.game_engine',
+            'rendering.renderer',
+            'networking.protocol',
+            'networking.server',
+            'networking.client',
+        ],
+    },
+    'single': {
+        'name': 'Tetris_Single',
+        'bundle': '--onefile',
+        'script': 'main.py',
+    },
+    'host': {
+        'name': 'Tetris_Host',
+        'bundle': '--onefile',
+        'script': 'tetris_host.py',
+        'mode': 'host',
+    },
+    'join': {
+        'name': 'Tetris_Join',
+        'bundle': '--onefile',
+        'script': 'tetris_join.py',
+        'mode': 'join',
+    },
+}
 
 
 def get_platform():
@@ -42,15 +100,71 @@ def install_dependencies():
     print("  ✓ Dependencies installed")
 
 
+def _run_pyinstaller(cmd):
+    """
+    Run PyInstaller, discarding its log unless the build fails.
+    
+    Args:
+        cmd (list[str]): Full PyInstaller command line
+    
+    Returns:
+        bool: True if PyInstaller exited successfully
+    """
+    # Spool stderr to disk instead of buffering megabytes of log in memory
+    with tempfile.TemporaryFile() as errors:
+        returncode = subprocess.call(cmd, stdout=subprocess.DEVNULL, stderr=errors)
+        if returncode:
+            errors.seek(0)
+            sys.stderr.flush()
+            sys.stderr.buffer.write(errors.read())
+            sys.stderr.flush()
+    return returncode == 0
+
+
+def create_mode_entry(script, mode):
+    """
+    Create an entry script that starts main.py in a fixed game mode.
+    
+    Args:
+        script (str): Path of the entry script to write
+        mode (str): Game mode passed as --mode
+    """
+    # Frozen executables get no command line from a double-click, so the
+    # mode is built in; arguments given by the user still come after it
+    entry_code = f'''#!/usr/bin/env python3
+"""
+Tetris entry point for {mode} mode (generated by build.py)
+"""
+
+import sys
+
+from main import main
+
+if __name__ == '__main__':
+    sys.argv[1:1] = ['--mode', '{mode}']
+    main()
+'''
+    
+    with open(script, 'w') as f:
+        f.write(entry_code)
+    
+    print(f"  ✓ Created {script}")
+
+
 def build_executable(mode, icon_path=None):
     """
-    Build executable for specific game mode.
+    Build executable for specific target.
     
     Args:
-        mode (str): Game mode ('single', 'host', 'join')
+        mode (str): Target name, a key of MODE_CONFIGS
         icon_path (str): Path to icon file (optional)
+    
+    Returns:
+        bool: True if the build succeeded
     """
-    print(f"\nBuilding Tetris_{mode.capitalize()}.exe...")
+    config = MODE_CONFIGS[mode]
+    output_name = config['name']
+    print(f"\nBuilding {output_name}...")
     
     # Determine output name based on platform
     plat = get_platform()
@@ -61,45 +175,37 @@ def build_executable(mode, icon_path=None):
     else:
         ext = ''
     
-    output_name = f'Tetris_{mode.capitalize()}'
-    
     # Build PyInstaller command
     cmd = [
         sys.executable, '-m', 'PyInstaller',
-        '--onefile',  # Single executable
+        config['bundle'],
         '--windowed',  # No console window
+        '--noupx',  # UPX compression dominates build time and slows startup
         '--name', output_name,
-        '--add-data', f'game_logic{os.pathsep}game_logic',
-        '--add-data', f'rendering{os.pathsep}rendering',
-        '--add-data', f'networking{os.pathsep}networking',
-        '--hidden-import', 'pygame',
-        '--hidden-import', 'game_logic',
-        '--hidden-import', 'rendering',
-        '--hidden-import', 'networking',
     ]
+    for package in PACKAGES:
+        cmd.extend(['--add-data', f'{package}{os.pathsep}{package}'])
+    for module in ['pygame'] + PACKAGES + config.get('hidden_imports', []):
+        cmd.extend(['--hidden-import', module])
+    for module in EXCLUDED_MODULES:
+        cmd.extend(['--exclude-module', module])
+    
+    # Targets with a fixed game mode start from a generated entry script
+    if 'mode' in config:
+        create_mode_entry(config['script'], config['mode'])
     
     # Add icon if provided
     if icon_path and os.path.exists(icon_path):
         cmd.extend(['--icon', icon_path])
     
-    # Add mode-specific arguments
-    if mode == 'single':
-        cmd.extend(['--', '--mode', 'single'])
-    elif mode == 'host':
-        cmd.extend(['--', '--mode', 'host'])
-    # For join mode, we'll need a GUI launcher
-    
-    cmd.append('main.py')
+    cmd.append(config['script'])
     
     # Run PyInstaller
-    result = subprocess.run(cmd, capture_output=True, text=True)
-    
-    if result.returncode == 0:
+    if _run_pyinstaller(cmd):
         print(f"  ✓ Built {output_name}{ext}")
         return True
     else:
         print(f"  ✗ Build failed for {mode}")
-        print(result.stderr)
         return False
 
 
@@ -156,12 +262,41 @@ if __name__ == '__main__':
     print("  ✓ Created launcher.py")
 
 
-def build_all():
-    """Build all executables."""
+def _build_one(target, cache_root):
+    """
+    Build a single target with its own PyInstaller cache directory.
+    
+    Args:
+        target (str): 'launcher' or a game mode ('single', 'host', 'join')
+        cache_root (str): Directory holding the per-target PyInstaller caches
+    
+    Returns:
+        bool: True if the build succeeded
+    """
+    # Concurrent PyInstaller runs must not share a cache directory
+    os.environ['PYINSTALLER_CONFIG_DIR'] = os.path.join(cache_root, target)
+    
+    return build_executable(target)
+
+
+def build_all(targets=('launcher',), jobs=1):
+    """
+    Build all executables.
+    
+    Args:
+        targets (tuple[str]): Targets to build ('launcher', 'single', 'host', 'join')
+        jobs (int): Number of targets to build in parallel
+    
+    Returns:
+        bool: True if every build succeeded
+    """
     print("=" * 60)
     print("  TETRIS LAN MULTIPLAYER - BUILD SCRIPT")
     print("=" * 60)
     
+    # Reuse PyInstaller's cache across builds (not removed by cleaning)
+    cache_root = os.environ.get('PYINSTALLER_CONFIG_DIR', os.path.abspath(PYINSTALLER_CACHE_DIR))
+    
     # Clean previous builds
     clean_build_folders()
     
@@ -171,46 +306,54 @@ def build_all():
     # Create GUI launcher
     create_launcher_gui()
     
-    # Build main launcher
-    print("\nBuilding Tetris_Launcher...")
-    cmd = [
-        sys.executable, '-m', 'PyInstaller',
-        '--onedir',  # Changed from --onefile to fix macOS issues
-        '--windowed',
-        '--name', 'Tetris_Launcher',
-        '--add-data', f'game_logic{os.pathsep}game_logic',
-        '--add-data', f'rendering{os.pathsep}rendering',
-        '--add-data', f'networking{os.pathsep}networking',
-        '--hidden-import', 'pygame',
-        '--hidden-import', 'game_logic',
-        '--hidden-import', 'rendering',
-        '--hidden-import', 'networking',
-        '--hidden-import', 'game_logic.pieces',
-        '--hidden-import', 'game_logic.board',
-        '--hidden-import', 'game_logic.game_engine',
-        '--hidden-import', 'rendering.renderer',
-        '--hidden-import', 'networking.protocol',
-        '--hidden-import', 'networking.server',
-        '--hidden-import', 'networking.client',
-        'launcher.py'
-    ]
-    
-    result = subprocess.run(cmd)
+    # Build targets (PyInstaller is single-threaded, targets are independent)
+    jobs = max(1, min(jobs, len(targets)))
+    if jobs > 1:
+        with ProcessPoolExecutor(max_workers=jobs) as executor:
+            results = list(executor.map(_build_one, targets, [cache_root] * len(targets)))
+    else:
+        results = [_build_one(target, cache_root) for target in targets]
     
-    if result.returncode == 0:
+    if all(results):
         print("\n" + "=" * 60)
         print("  ✓ BUILD SUCCESSFUL!")
         print("=" * 60)
         print(f"\nExecutable created in: dist/")
-        print(f"Look for: Tetris_Launcher{'.exe' if get_platform() == 'windows' else ''}")
+        if 'launcher' in targets:
+            print(f"Look for: Tetris_Launcher{'.exe' if get_platform() == 'windows' else ''}")
         print("\nDistribute this file to your friends - no Python needed!")
         return True
     else:
-        print("\n✗ Build failed")
+        failed = [target for target, ok in zip(targets, results) if not ok]
+        print(f"\n✗ Build failed: {', '.join(failed)}")
         return False
 
 
+def parse_arguments():
+    """
+    Parse command-line arguments.
+    
+    Returns:
+        argparse.Namespace: Parsed arguments
+    """
+    parser = argparse.ArgumentParser(description='Build Tetris executables')
+    parser.add_argument(
+        '-t', '--target',
+        dest='targets',
+        action='append',
+        choices=list(MODE_CONFIGS),
+        help='Target to build, may be repeated (default: launcher)'
+    )
+    parser.add_argument(
+        '-j', '--jobs',
+        type=int,
+        default=1,
+        help='Number of targets to build in parallel (default: 1)'
+    )
+    return parser.parse_args()
+
+
 if __name__ == '__main__':
-    success = build_all()
+    args = parse_arguments()
+    success = build_all(tuple(args.targets or ['launcher']), args.jobs)
     sys.exit(0 if success else 1)
-
@@ -7,7 +7,6 @@ import pygame
 import time
 from game_logic import GameEngine
 from rendering import Renderer
-from networking import GameClient, GameServer
 
 
 class GameController:
@@ -16,6 +15,37 @@ class GameController:
     Single responsibility: Coordinate input, game logic, rendering, and networking.
     """
     
+    # Only these events are queued; everything else (mouse motion etc.) is dropped
+    INPUT_EVENTS = (
+        pygame.QUIT, pygame.KEYDOWN, pygame.KEYUP,
+        pygame.WINDOWFOCUSGAINED, pygame.WINDOWFOCUSLOST, pygame.WINDOWEXPOSED,
+    )
+    
+    # Frame rate while the window has focus / is in the background
+    ACTIVE_FPS = 60
+    BACKGROUND_FPS = 5
+    
+    # Movement keys that repeat while held
+    HELD_KEYS = {
+        pygame.K_LEFT: 'left',
+        pygame.K_RIGHT: 'right',
+        pygame.K_DOWN: 'down',
+    }
+    MOVE_ACTIONS = {
+        'left': GameEngine.move_left,
+        'right': GameEngine.move_right,
+        'down': GameEngine.move_down,
+    }
+    
+    # Single-press actions
+    KEY_ACTIONS = {
+        pygame.K_UP: GameEngine.rotate_clockwise,
+        pygame.K_x: GameEngine.rotate_clockwise,
+        pygame.K_z: GameEngine.rotate_counter_clockwise,
+        pygame.K_SPACE: GameEngine.hard_drop,
+        pygame.K_LSHIFT: GameEngine.hold_current_piece,
+    }
+    
     def __init__(self, mode='single', host=None, port=5555):
         """
         Initialize game controller.
@@ -29,7 +59,10 @@ class GameController:
         self.game_engine = GameEngine()
         self.renderer = Renderer()
         self.clock = pygame.time.Clock()
+        pygame.event.set_blocked(None)
+        pygame.event.set_allowed(self.INPUT_EVENTS)
         self.running = True
+        self.focused = True
         
         # Input handling for held keys
         self.keys_held = {
@@ -48,8 +81,9 @@ class GameController:
         # Networking
         self.server = None
         self.client = None
-        self.last_state_send = time.time()
-        self.state_send_interval = 0.1  # Send state 10 times per second
+        self.last_state_send = pygame.time.get_ticks()
+        self.state_send_interval = 100  # Send state 10 times per second (ms)
+        self._last_sent_version = None
         
         # Setup networking based on mode
         if mode == 'host':
@@ -59,19 +93,24 @@ class GameController:
     
     def _setup_host(self, port):
         """Setup as host (server + client)."""
+        # Networking is only imported by the multiplayer modes
+        from networking import GameClient, GameServer
+        
         self.server = GameServer(port=port)
         self.server.start()
         print(f"Hosting game on port {port}")
         print(f"Other players can join with: --mode join --host <your_ip> --port {port}")
         
-        # Also connect as client to own server
+        # Also connect as client to own server (start() returns once the
+        # socket is listening, so no wait is needed)
         self.client = GameClient()
-        time.sleep(0.5)  # Give server time to start
         if not self.client.connect('localhost', port):
             print("Warning: Could not connect to own server")
     
     def _setup_client(self, host, port):
         """Setup as client."""
+        from networking import GameClient
+        
         self.client = GameClient()
         print(f"Connecting to {host}:{port}...")
         if self.client.connect(host, port):
@@ -91,6 +130,22 @@ class GameController:
             self.running = False
             return
         
+        if event.type == pygame.WINDOWFOCUSGAINED:
+            self.focused = True
+            return
+        
+        if event.type == pygame.WINDOWEXPOSED:
+            # Unchanged frames are skipped, so repaint what the OS discarded
+            self.renderer.invalidate()
+            return
+        
+        if event.type == pygame.WINDOWFOCUSLOST:
+            self.focused = False
+            # Key releases are not delivered while unfocused
+            for direction in self.keys_held:
+                self.keys_held[direction] = False
+            return
+        
         if event.type == pygame.KEYDOWN:
             # Game over restart
             if event.key == pygame.K_r and self.game_engine.game_over:
@@ -107,41 +162,23 @@ class GameController:
                 return
             
             # Movement - initial press
-            if event.key == pygame.K_LEFT:
-                self.game_engine.move_left()
-                self.keys_held['left'] = True
-                self.last_move_time['left'] = time.time()
-            elif event.key == pygame.K_RIGHT:
-                self.game_engine.move_right()
-                self.keys_held['right'] = True
-                self.last_move_time['right'] = time.time()
-            elif event.key == pygame.K_DOWN:
-                self.game_engine.move_down()
-                self.keys_held['down'] = True
-                self.last_move_time['down'] = time.time()
-            
-            # Rotation
-            elif event.key == pygame.K_UP or event.key == pygame.K_x:
-                self.game_engine.rotate_clockwise()
-            elif event.key == pygame.K_z:
-                self.game_engine.rotate_counter_clockwise()
-            
-            # Hard drop
-            elif event.key == pygame.K_SPACE:
-                self.game_engine.hard_drop()
+            direction = self.HELD_KEYS.get(event.key)
+            if direction is not None:
+                self.MOVE_ACTIONS[direction](self.game_engine)
+                self.keys_held[direction] = True
+                self.last_move_time[direction] = time.time()
+                return
             
-            # Hold
-            elif event.key == pygame.K_LSHIFT:
-                self.game_engine.hold_current_piece()
+            # Rotation, hard drop and hold
+            action = self.KEY_ACTIONS.get(event.key)
+            if action is not None:
+                action(self.game_engine)
         
         elif event.type == pygame.KEYUP:
             # Stop holding keys
-            if event.key == pygame.K_LEFT:
-                self.keys_held['left'] = False
-            elif event.key == pygame.K_RIGHT:
-                self.keys_held['right'] = False
-            elif event.key == pygame.K_DOWN:
-                self.keys_held['down'] = False
+            direction = self.HELD_KEYS.get(event.key)
+            if direction is not None:
+                self.keys_held[direction] = False
     
     def update(self, delta_time):
         """
@@ -180,10 +217,17 @@ class GameController:
         
         # Send state updates in multiplayer
         if self.client and self.client.is_connected():
-            current_time = time.time()
+            current_time = pygame.time.get_ticks()
             if current_time - self.last_state_send >= self.state_send_interval:
-                state = self.game_engine.get_state()
-                self.client.send_state_update(state)
+                # Skip the send if nothing changed since the last update
+                state_version = self.game_engine.state_version
+                if state_version != self._last_sent_version:
+                    # Mostly send the changed rows, with periodic full states
+                    if self.client.needs_keyframe():
+                        self.client.send_state_update(self.game_engine.get_state())
+                    else:
+                        self.client.send_state_delta(self.game_engine.get_state(delta=True))
+                    self._last_sent_version = state_version
                 self.last_state_send = current_time
             
             # Send game over notification
@@ -204,26 +248,20 @@ class GameController:
         if not self.running:
             return
         
-        last_time = time.time()
-        
         while self.running:
-            # Calculate delta time
-            current_time = time.time()
-            delta_time = current_time - last_time
-            last_time = current_time
+            # Cap frame rate (slow poll in background) and get time since last frame
+            fps = self.ACTIVE_FPS if self.focused else self.BACKGROUND_FPS
+            delta_time = self.clock.tick(fps) / 1000.0
             
             # Handle events
-            for event in pygame.event.get():
+            for event in pygame.event.get(self.INPUT_EVENTS):
                 self.handle_input(event)
             
             # Update game
             self.update(delta_time)
             
-            # Render
+            # Render (the renderer skips frames where nothing changed)
             self.render()
-            
-            # Cap frame rate
-            self.clock.tick(60)
         
         self.cleanup()
     
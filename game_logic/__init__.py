@@ -3,9 +3,9 @@ Game logic package for Tetris.
 Contains all core game mechanics and business logic.
 """
 
-from .pieces import Piece, PIECES, COLORS
+from .pieces import Piece, PIECES, COLORS, PALETTE
 from .board import Board
 from .game_engine import GameEngine
 
-__all__ = ['Piece', 'PIECES', 'COLORS', 'Board', 'GameEngine']
+__all__ = ['Piece', 'PIECES', 'COLORS', 'PALETTE', 'Board', 'GameEngine']
 
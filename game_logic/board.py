@@ -3,7 +3,8 @@ Game board management and collision detection.
 Handles the 10x20 Tetris playfield.
 """
 
-from .pieces import Piece, COLORS
+import numpy as np
+from .pieces import Piece, COLORS, PIECE_MASKS, PIECE_BOUNDS
 
 
 class Board:
@@ -15,11 +16,30 @@ class Board:
     WIDTH = 10
     HEIGHT = 20
     
+    # Row bitmasks keep column n at bit (n + WALL_PAD). Every bit outside
+    # the playfield is set, so walls and blocks collide with a single AND.
+    WALL_PAD = 4
+    EMPTY_ROW = ~(((1 << WIDTH) - 1) << WALL_PAD)
+    FULL_ROW = -1
+    
+    # Bitmask with one bit per row (bit n = row n)
+    ALL_ROWS = (1 << HEIGHT) - 1
+    
+    # Shifts covered by SHIFTED_MASKS (x from -WALL_PAD to WIDTH - 1)
+    SHIFT_LIMIT = WIDTH + WALL_PAD
+    
     def __init__(self):
         """Initialize an empty board."""
-        self.grid = [[None for _ in range(self.WIDTH)] for _ in range(self.HEIGHT)]
+        # Color id per cell (0 = empty), see pieces.COLOR_IDS
+        self.grid = np.zeros((self.HEIGHT, self.WIDTH), dtype=np.uint8)
+        # Occupancy bitmask per row, used for collision and line detection
+        self.row_mask = [self.EMPTY_ROW] * self.HEIGHT
+        # Topmost filled row per column (HEIGHT = empty column)
+        self.column_top = [self.HEIGHT] * self.WIDTH
+        # Rows changed since the last take_dirty_rows() (bit n = row n)
+        self.dirty_rows = self.ALL_ROWS
     
-    def is_valid_position(self, piece, x, y):
+    def is_valid_position(self, piece, x, y, rotation=None):
         """
         Check if a piece can be placed at the given position.
         
@@ -27,26 +47,26 @@ class Board:
             piece (Piece): The piece to check
             x (int): X coordinate (column)
             y (int): Y coordinate (row)
+            rotation (int): Rotation to test instead of the piece's own (optional)
         
         Returns:
             bool: True if position is valid, False otherwise
         """
-        cells = piece.get_occupied_cells()
+        if rotation is None:
+            rotation = piece.rotation
         
-        for cell_row, cell_col in cells:
-            board_row = y + cell_row
-            board_col = x + cell_col
-            
-            # Check boundaries
-            if board_col < 0 or board_col >= self.WIDTH:
-                return False
-            if board_row >= self.HEIGHT:
-                return False
-            if board_row < 0:
-                continue  # Allow pieces above board during spawn
+        # Reject positions past the walls or floor before touching any row
+        min_col, max_col, _, max_row = PIECE_BOUNDS[piece.type][rotation]
+        if x + min_col < 0 or x + max_col >= self.WIDTH or y + max_row >= self.HEIGHT:
+            return False
+        
+        row_mask = self.row_mask
+        for row_offset, mask in SHIFTED_MASKS[piece.type][rotation][x + self.WALL_PAD]:
+            board_row = y + row_offset
             
-            # Check collision with existing blocks
-            if self.grid[board_row][board_col] is not None:
+            # Rows above the board are open (allowed during spawn), the
+            # rest collide with existing blocks through a single AND
+            if board_row >= 0 and row_mask[board_row] & mask:
                 return False
         
         return True
@@ -60,14 +80,26 @@ class Board:
             x (int): X coordinate (column)
             y (int): Y coordinate (row)
         """
-        cells = piece.get_occupied_cells()
+        cell_rows, cell_cols = piece.get_cell_arrays()
+        rows = cell_rows + y
+        cols = cell_cols + x
         
-        for cell_row, cell_col in cells:
+        inside = (rows >= 0) & (rows < self.HEIGHT) & (cols >= 0) & (cols < self.WIDTH)
+        self.grid[rows[inside], cols[inside]] = piece.color_id
+        
+        shift = x + self.WALL_PAD
+        for row_offset, mask in SHIFTED_MASKS[piece.type][piece.rotation][shift]:
+            board_row = y + row_offset
+            if 0 <= board_row < self.HEIGHT:
+                self.row_mask[board_row] |= mask
+                self.dirty_rows |= 1 << board_row
+        
+        column_top = self.column_top
+        for cell_row, cell_col in piece.get_occupied_cells():
             board_row = y + cell_row
             board_col = x + cell_col
-            
-            if 0 <= board_row < self.HEIGHT and 0 <= board_col < self.WIDTH:
-                self.grid[board_row][board_col] = piece.color
+            if 0 <= board_row < column_top[board_col]:
+                column_top[board_col] = board_row
     
     def clear_lines(self):
         """
@@ -76,19 +108,31 @@ class Board:
         Returns:
             int: Number of lines cleared
         """
-        lines_to_clear = []
-        
         # Find complete lines
-        for row in range(self.HEIGHT):
-            if all(cell is not None for cell in self.grid[row]):
-                lines_to_clear.append(row)
+        lines_to_clear = [
+            row for row, row_bits in enumerate(self.row_mask)
+            if row_bits == self.FULL_ROW
+        ]
+        if not lines_to_clear:
+            return 0
+        
+        # Rebuild the row masks in one pass, padding with empty rows on top
+        lines_cleared = len(lines_to_clear)
+        self.row_mask = [self.EMPTY_ROW] * lines_cleared + [
+            row_bits for row_bits in self.row_mask if row_bits != self.FULL_ROW
+        ]
         
-        # Remove complete lines
-        for row in sorted(lines_to_clear, reverse=True):
-            del self.grid[row]
-            self.grid.insert(0, [None for _ in range(self.WIDTH)])
+        # Shift the remaining rows down in place and empty the top rows
+        keep = np.ones(self.HEIGHT, dtype=bool)
+        keep[lines_to_clear] = False
+        self.grid[lines_cleared:] = self.grid[keep]
+        self.grid[:lines_cleared] = 0
+        self._rebuild_column_tops()
         
-        return len(lines_to_clear)
+        # Every row at or above the lowest cleared line has moved
+        self.dirty_rows |= (2 << lines_to_clear[-1]) - 1
+        
+        return lines_cleared
     
     def is_game_over(self):
         """
@@ -97,11 +141,8 @@ class Board:
         Returns:
             bool: True if game over, False otherwise
         """
-        # Check if any blocks in the top 2 rows
-        for row in range(1):
-            if any(cell is not None for cell in self.grid[row]):
-                return True
-        return False
+        # Check if any blocks in the top row
+        return self.row_mask[0] != self.EMPTY_ROW
     
     def get_drop_position(self, piece, x, y):
         """
@@ -115,9 +156,30 @@ class Board:
         Returns:
             int: Y coordinate where piece would land
         """
+        drop_y = self.HEIGHT
+        for col_offset, bottom in piece.get_bottom_profile():
+            top = self.column_top[x + col_offset]
+            if y + bottom >= top:
+                # Piece is tucked under an overhang, fall back to scanning
+                return self._scan_drop_position(piece, x, y)
+            drop_y = min(drop_y, top - bottom - 1)
+        return drop_y
+    
+    def _scan_drop_position(self, piece, x, y):
+        """Find the landing row by testing each row below the piece."""
+        # The column doesn't change, so test the shifted masks directly
+        masks = SHIFTED_MASKS[piece.type][piece.rotation][x + self.WALL_PAD]
+        last_y = self.HEIGHT - 1 - PIECE_BOUNDS[piece.type][piece.rotation][3]
+        row_mask = self.row_mask
+        
         drop_y = y
-        while self.is_valid_position(piece, x, drop_y + 1):
-            drop_y += 1
+        while drop_y < last_y:
+            next_y = drop_y + 1
+            for row_offset, mask in masks:
+                board_row = next_y + row_offset
+                if board_row >= 0 and row_mask[board_row] & mask:
+                    return drop_y
+            drop_y = next_y
         return drop_y
     
     def get_state(self):
@@ -125,20 +187,81 @@ class Board:
         Get the current board state for serialization.
         
         Returns:
-            list[list]: Board grid state
+            bytes: Color id per cell, row by row (WIDTH * HEIGHT bytes)
         """
-        return [row[:] for row in self.grid]
+        return self.grid.tobytes()
     
     def set_state(self, state):
         """
         Set the board state from serialized data.
         
         Args:
-            state (list[list]): Board grid state
+            state (bytes): Color id per cell, row by row (WIDTH * HEIGHT bytes)
         """
-        self.grid = [row[:] for row in state]
+        self.grid = np.frombuffer(state, dtype=np.uint8).reshape(self.HEIGHT, self.WIDTH).copy()
+        self._rebuild_row_masks()
+        self._rebuild_column_tops()
+        self.dirty_rows = self.ALL_ROWS
+    
+    def get_rows_state(self, rows):
+        """
+        Get some rows of the board state for serialization.
+        
+        Args:
+            rows (int): Bitmask of the rows to pack (bit n = row n)
+        
+        Returns:
+            bytes: Color id per cell of each selected row, top to bottom
+                (WIDTH bytes per row)
+        """
+        selected = [row for row in range(self.HEIGHT) if rows >> row & 1]
+        return self.grid[selected].tobytes()
+    
+    def take_dirty_rows(self):
+        """
+        Get the rows changed since the previous call and clear the record.
+        
+        Returns:
+            int: Bitmask of changed rows (bit n = row n)
+        """
+        dirty_rows = self.dirty_rows
+        self.dirty_rows = 0
+        return dirty_rows
+    
+    def _rebuild_row_masks(self):
+        """Recompute the row bitmasks from the color grid."""
+        column_bits = 1 << np.arange(self.WIDTH, dtype=np.int64)
+        occupancy = (self.grid != 0) @ column_bits
+        self.row_mask = [
+            self.EMPTY_ROW | (int(bits) << self.WALL_PAD) for bits in occupancy
+        ]
+    
+    def _rebuild_column_tops(self):
+        """Recompute the topmost filled row of each column from the grid."""
+        filled = self.grid != 0
+        self.column_top = np.where(
+            filled.any(axis=0), filled.argmax(axis=0), self.HEIGHT
+        ).tolist()
     
     def reset(self):
         """Reset the board to empty state."""
-        self.grid = [[None for _ in range(self.WIDTH)] for _ in range(self.HEIGHT)]
+        self.grid = np.zeros((self.HEIGHT, self.WIDTH), dtype=np.uint8)
+        self.row_mask = [self.EMPTY_ROW] * self.HEIGHT
+        self.column_top = [self.HEIGHT] * self.WIDTH
+        self.dirty_rows = self.ALL_ROWS
+
+
+def _shifted_masks(row_masks):
+    """Return the piece row masks shifted to every in-range column."""
+    return tuple(
+        tuple((row_offset, mask << shift) for row_offset, mask in row_masks)
+        for shift in range(Board.SHIFT_LIMIT)
+    )
+
 
+# Piece row masks already shifted into board bit positions, indexed
+# [type][rotation][x + WALL_PAD], so collision is a lookup and an AND
+SHIFTED_MASKS = {
+    piece_type: tuple(_shifted_masks(row_masks) for row_masks in rotations)
+    for piece_type, rotations in PIECE_MASKS.items()
+}
@@ -4,8 +4,7 @@ Handles game state, scoring, piece management, and game rules.
 """
 
 import random
-import time
-from .pieces import Piece, PIECES
+from .pieces import Piece, PIECE_TYPES, SRS_KICKS
 from .board import Board
 
 
@@ -15,13 +14,21 @@ class GameEngine:
     Single responsibility: Manage game rules and state transitions.
     """
     
-    # Scoring rules
-    SCORE_VALUES = {
-        1: 100,   # Single
-        2: 300,   # Double
-        3: 500,   # Triple
-        4: 800,   # Tetris
-    }
+    __slots__ = (
+        'board', 'score', 'lines_cleared', 'level', 'game_over', 'paused',
+        '_input_locked',
+        'current_piece', 'piece_x', 'piece_y', 'next_pieces', '_bag',
+        'hold_piece', 'can_hold', '_active_pieces',
+        '_drop_accum', '_lock_accum', 'combo', 'state_version', '_ghost_y',
+        '_state', '_delta_state', '_board_dirty',
+    )
+    
+    # Scoring rules, indexed by lines cleared at once:
+    # none, single, double, triple, tetris
+    SCORE_VALUES = (0, 100, 300, 500, 800)
+    
+    # Spawn column (centered at top)
+    SPAWN_X = Board.WIDTH // 2 - 2
     
     # Game timing (in seconds)
     LOCK_DELAY = 0.5
@@ -37,50 +44,102 @@ class GameEngine:
         self.game_over = False
         self.paused = False
         
+        # True while input is ignored (game over, paused or no piece yet)
+        self._input_locked = True
+        
         # Piece management
         self.current_piece = None
         self.piece_x = 0
         self.piece_y = 0
         self.next_pieces = []  # Queue showing next 2 pieces
+        self._bag = []  # Remaining piece types of the current 7-bag
         self.hold_piece = None
         self.can_hold = True
         
-        # Timing
-        self.last_drop_time = time.time()
-        self.lock_timer = None
+        # Movable piece per type, reused on every spawn (queue and hold
+        # show the shared Piece.get() instances, which never rotate)
+        self._active_pieces = {piece_type: Piece(piece_type) for piece_type in PIECE_TYPES}
+        
+        # Timing (seconds accumulated from update's delta_time)
+        self._drop_accum = 0.0
+        self._lock_accum = None  # None while the piece can still fall
         
         # Combo tracking
         self.combo = 0
         
+        # Incremented on every change visible in get_state()
+        self.state_version = 0
+        
+        # Cached ghost landing row, None when it must be recomputed
+        self._ghost_y = None
+        
+        # State dict reused by get_state(), the board is only re-serialized
+        # after a piece locks
+        self._state = {
+            'board': None,
+            'score': 0,
+            'lines_cleared': 0,
+            'level': 1,
+            'game_over': False,
+            'current_piece': {'type': None, 'rotation': 0, 'x': 0, 'y': 0},
+            'next_pieces': [],
+            'hold_piece': None,
+        }
+        self._board_dirty = True
+        
+        # Same fields with only the changed board rows, see get_state(delta=True)
+        self._delta_state = {key: value for key, value in self._state.items() if key != 'board'}
+        self._delta_state['board_rows'] = 0
+        self._delta_state['row_data'] = b''
+        
         # Initialize piece queue
         self._fill_piece_queue()
         self._spawn_new_piece()
     
     def _fill_piece_queue(self):
         """Fill the piece queue to show next 2 pieces."""
-        piece_types = list(PIECES.keys())
         while len(self.next_pieces) < 2:
-            self.next_pieces.append(Piece(random.choice(piece_types)))
+            # 7-bag randomizer: deal every piece type once per shuffled bag
+            if not self._bag:
+                self._bag = list(PIECE_TYPES)
+                random.shuffle(self._bag)
+            self.next_pieces.append(Piece.get(self._bag.pop()))
     
     def _spawn_new_piece(self):
         """Spawn a new piece at the top of the board."""
         if not self.next_pieces:
             self._fill_piece_queue()
         
-        self.current_piece = self.next_pieces.pop(0)
+        self.current_piece = self._take_piece(self.next_pieces.pop(0).type)
         self._fill_piece_queue()
         
         # Spawn position (centered at top)
-        self.piece_x = Board.WIDTH // 2 - 2
+        self.piece_x = self.SPAWN_X
         self.piece_y = 0
         
         # Check if spawn position is valid
         if not self.board.is_valid_position(self.current_piece, self.piece_x, self.piece_y):
             self.game_over = True
+        self._input_locked = self.game_over or self.paused
         
         # Reset hold ability
         self.can_hold = True
-        self.lock_timer = None
+        self._lock_accum = None
+        self._ghost_y = None
+    
+    def _take_piece(self, piece_type):
+        """
+        Get this engine's movable piece of a type, back in spawn rotation.
+        
+        Args:
+            piece_type (str): One of 'I', 'O', 'T', 'S', 'Z', 'J', 'L'
+        
+        Returns:
+            Piece: Reused piece with rotation 0
+        """
+        piece = self._active_pieces[piece_type]
+        piece.rotation = 0
+        return piece
     
     def move_left(self):
         """
@@ -89,12 +148,14 @@ class GameEngine:
         Returns:
             bool: True if move succeeded, False otherwise
         """
-        if self.game_over or self.paused or not self.current_piece:
+        if self._input_locked:
             return False
         
         new_x = self.piece_x - 1
         if self.board.is_valid_position(self.current_piece, new_x, self.piece_y):
             self.piece_x = new_x
+            self._ghost_y = None
+            self.state_version += 1
             return True
         return False
     
@@ -105,12 +166,14 @@ class GameEngine:
         Returns:
             bool: True if move succeeded, False otherwise
         """
-        if self.game_over or self.paused or not self.current_piece:
+        if self._input_locked:
             return False
         
         new_x = self.piece_x + 1
         if self.board.is_valid_position(self.current_piece, new_x, self.piece_y):
             self.piece_x = new_x
+            self._ghost_y = None
+            self.state_version += 1
             return True
         return False
     
@@ -121,18 +184,19 @@ class GameEngine:
         Returns:
             bool: True if move succeeded, False if piece locked
         """
-        if self.game_over or self.paused or not self.current_piece:
+        if self._input_locked:
             return False
         
         new_y = self.piece_y + 1
         if self.board.is_valid_position(self.current_piece, self.piece_x, new_y):
             self.piece_y = new_y
-            self.lock_timer = None  # Reset lock delay
+            self._lock_accum = None  # Reset lock delay
+            self.state_version += 1
             return True
         else:
             # Start lock delay if not already started
-            if self.lock_timer is None:
-                self.lock_timer = time.time()
+            if self._lock_accum is None:
+                self._lock_accum = 0.0
             return False
     
     def rotate_clockwise(self):
@@ -142,17 +206,7 @@ class GameEngine:
         Returns:
             bool: True if rotation succeeded, False otherwise
         """
-        if self.game_over or self.paused or not self.current_piece:
-            return False
-        
-        self.current_piece.rotate_clockwise()
-        if not self.board.is_valid_position(self.current_piece, self.piece_x, self.piece_y):
-            # Try wall kicks
-            if not self._try_wall_kicks():
-                # Rotation failed, revert
-                self.current_piece.rotate_counter_clockwise()
-                return False
-        return True
+        return self._rotate(1)
     
     def rotate_counter_clockwise(self):
         """
@@ -161,33 +215,54 @@ class GameEngine:
         Returns:
             bool: True if rotation succeeded, False otherwise
         """
-        if self.game_over or self.paused or not self.current_piece:
+        return self._rotate(-1)
+    
+    def _rotate(self, direction):
+        """
+        Rotate current piece a quarter turn if possible.
+        
+        Args:
+            direction (int): 1 for clockwise, -1 for counter-clockwise
+        
+        Returns:
+            bool: True if rotation succeeded, False otherwise
+        """
+        if self._input_locked:
             return False
         
-        self.current_piece.rotate_counter_clockwise()
-        if not self.board.is_valid_position(self.current_piece, self.piece_x, self.piece_y):
-            # Try wall kicks
-            if not self._try_wall_kicks():
-                # Rotation failed, revert
-                self.current_piece.rotate_clockwise()
-                return False
+        piece = self.current_piece
+        to_rotation = (piece.rotation + direction) & 3
+        position = self._resolve_kick(piece, to_rotation)
+        if position is None:
+            return False
+        
+        piece.rotation = to_rotation
+        self.piece_x, self.piece_y = position
+        self._ghost_y = None
+        self.state_version += 1
         return True
     
-    def _try_wall_kicks(self):
+    def _resolve_kick(self, piece, to_rotation):
         """
-        Try wall kick positions for rotation.
+        Find the first SRS wall kick position that fits a rotation.
+        The piece itself is not modified.
+        
+        Args:
+            piece (Piece): The piece being rotated
+            to_rotation (int): Rotation state after rotating
         
         Returns:
-            bool: True if a valid position was found
+            tuple[int, int] | None: New (x, y), or None if every test collides
         """
-        # Simple wall kick: try offsets
-        offsets = [(1, 0), (-1, 0), (0, -1), (2, 0), (-2, 0)]
-        for dx, dy in offsets:
-            if self.board.is_valid_position(self.current_piece, self.piece_x + dx, self.piece_y + dy):
-                self.piece_x += dx
-                self.piece_y += dy
-                return True
-        return False
+        x = self.piece_x
+        y = self.piece_y
+        is_valid_position = self.board.is_valid_position
+        
+        # The first test is no offset
+        for dx, dy in SRS_KICKS[piece.type][piece.rotation][to_rotation]:
+            if is_valid_position(piece, x + dx, y + dy, to_rotation):
+                return x + dx, y + dy
+        return None
     
     def hard_drop(self):
         """
@@ -196,13 +271,13 @@ class GameEngine:
         Returns:
             int: Number of cells dropped
         """
-        if self.game_over or self.paused or not self.current_piece:
+        if self._input_locked:
             return 0
         
-        drop_distance = 0
-        while self.board.is_valid_position(self.current_piece, self.piece_x, self.piece_y + 1):
-            self.piece_y += 1
-            drop_distance += 1
+        # Jump straight to the (cached) landing row
+        drop_y = self.get_ghost_position()
+        drop_distance = drop_y - self.piece_y
+        self.piece_y = drop_y
         
         self._lock_piece()
         return drop_distance
@@ -214,27 +289,32 @@ class GameEngine:
         Returns:
             bool: True if hold succeeded, False otherwise
         """
-        if self.game_over or self.paused or not self.can_hold or not self.current_piece:
+        if self._input_locked or not self.can_hold:
             return False
         
         if self.hold_piece is None:
             # First hold
-            self.hold_piece = Piece(self.current_piece.type)
+            self.hold_piece = Piece.get(self.current_piece.type)
             self._spawn_new_piece()
         else:
             # Swap pieces
             temp_type = self.hold_piece.type
-            self.hold_piece = Piece(self.current_piece.type)
-            self.current_piece = Piece(temp_type)
-            self.piece_x = Board.WIDTH // 2 - 2
+            self.hold_piece = Piece.get(self.current_piece.type)
+            self.current_piece = self._take_piece(temp_type)
+            self.piece_x = self.SPAWN_X
             self.piece_y = 0
+            self._ghost_y = None
         
         self.can_hold = False
+        self.state_version += 1
         return True
     
     def _lock_piece(self):
         """Lock the current piece to the board and spawn new piece."""
         self.board.place_piece(self.current_piece, self.piece_x, self.piece_y)
+        self._ghost_y = None
+        self._board_dirty = True
+        self.state_version += 1
         
         # Clear lines and update score
         lines = self.board.clear_lines()
@@ -247,6 +327,7 @@ class GameEngine:
         # Check game over
         if self.board.is_game_over():
             self.game_over = True
+            self._input_locked = True
         else:
             self._spawn_new_piece()
     
@@ -257,7 +338,7 @@ class GameEngine:
         Args:
             lines_cleared (int): Number of lines cleared
         """
-        base_score = self.SCORE_VALUES.get(lines_cleared, 0)
+        base_score = self.SCORE_VALUES[lines_cleared] if lines_cleared < len(self.SCORE_VALUES) else 0
         combo_bonus = self.combo * 50
         level_multiplier = self.level
         
@@ -274,24 +355,24 @@ class GameEngine:
         Update game state based on elapsed time.
         
         Args:
-            delta_time (float): Time elapsed since last update
+            delta_time (float): Time elapsed since last update, in seconds
         """
-        if self.game_over or self.paused:
+        if self._input_locked:
             return
         
-        current_time = time.time()
-        
         # Check lock delay
-        if self.lock_timer is not None:
-            if current_time - self.lock_timer >= self.LOCK_DELAY:
+        if self._lock_accum is not None:
+            self._lock_accum += delta_time
+            if self._lock_accum >= self.LOCK_DELAY:
                 self._lock_piece()
                 return
         
         # Auto drop
         drop_speed = max(0.1, self.INITIAL_DROP_SPEED - (self.level - 1) * self.SPEED_INCREASE_PER_LEVEL)
-        if current_time - self.last_drop_time >= drop_speed:
+        self._drop_accum += delta_time
+        if self._drop_accum >= drop_speed:
             self.move_down()
-            self.last_drop_time = current_time
+            self._drop_accum = 0.0
     
     def get_ghost_position(self):
         """
@@ -302,37 +383,62 @@ class GameEngine:
         """
         if not self.current_piece:
             return 0
-        return self.board.get_drop_position(self.current_piece, self.piece_x, self.piece_y)
+        
+        # Moving down doesn't change the landing row, so only moves,
+        # rotations, holds and board changes invalidate the cache
+        if self._ghost_y is None:
+            self._ghost_y = self.board.get_drop_position(self.current_piece, self.piece_x, self.piece_y)
+        return self._ghost_y
     
     def toggle_pause(self):
         """Toggle pause state."""
         if not self.game_over:
             self.paused = not self.paused
+            self._input_locked = self.paused
     
     def reset(self):
         """Reset the game to initial state."""
+        # Keep the version moving forward so observers see the new game
+        state_version = self.state_version
         self.__init__()
+        self.state_version = state_version + 1
     
-    def get_state(self):
+    def get_state(self, delta=False):
         """
         Get complete game state for serialization.
         
+        Args:
+            delta (bool): Replace the full board with the rows changed since
+                the previous call: 'board_rows' is their bitmask and
+                'row_data' their packed bytes, top to bottom
+        
         Returns:
-            dict: Complete game state
+            dict: Game state (the same dict per mode, updated in place)
         """
-        return {
-            'board': self.board.get_state(),
-            'score': self.score,
-            'lines_cleared': self.lines_cleared,
-            'level': self.level,
-            'game_over': self.game_over,
-            'current_piece': {
-                'type': self.current_piece.type if self.current_piece else None,
-                'rotation': self.current_piece.rotation if self.current_piece else 0,
-                'x': self.piece_x,
-                'y': self.piece_y,
-            },
-            'next_pieces': [p.type for p in self.next_pieces],
-            'hold_piece': self.hold_piece.type if self.hold_piece else None,
-        }
-
+        board = self.board
+        dirty_rows = board.take_dirty_rows()
+        if delta:
+            state = self._delta_state
+            state['board_rows'] = dirty_rows
+            state['row_data'] = board.get_rows_state(dirty_rows)
+        else:
+            state = self._state
+            if self._board_dirty:
+                state['board'] = board.get_state()
+                self._board_dirty = False
+        
+        state['score'] = self.score
+        state['lines_cleared'] = self.lines_cleared
+        state['level'] = self.level
+        state['game_over'] = self.game_over
+        
+        current = state['current_piece']
+        piece = self.current_piece
+        current['type'] = piece.type if piece else None
+        current['rotation'] = piece.rotation if piece else 0
+        current['x'] = self.piece_x
+        current['y'] = self.piece_y
+        
+        state['next_pieces'] = [p.type for p in self.next_pieces]
+        state['hold_piece'] = self.hold_piece.type if self.hold_piece else None
+        return state
@@ -3,6 +3,8 @@ Tetromino piece definitions and rotation logic.
 Implements SRS (Super Rotation System) rotation states.
 """
 
+import numpy as np
+
 # Color definitions (RGB)
 COLORS = {
     'I': (0, 255, 255),    # Cyan
@@ -16,144 +18,285 @@ COLORS = {
     'EMPTY': (0, 0, 0),    # Empty cell
 }
 
+# Integer color ids stored in the board grid (0 = empty)
+COLOR_IDS = {
+    'I': 1,
+    'O': 2,
+    'T': 3,
+    'S': 4,
+    'Z': 5,
+    'J': 6,
+    'L': 7,
+}
+
+# Color id -> RGB lookup table
+PALETTE = (COLORS['EMPTY'],) + tuple(
+    COLORS[piece_type] for piece_type, _ in sorted(COLOR_IDS.items(), key=lambda item: item[1])
+)
+
 # Tetromino shapes in SRS rotation system (4 rotation states each)
-# Format: [rotation_0, rotation_1, rotation_2, rotation_3]
-# Each rotation is a 4x4 grid where 1 = filled, 0 = empty
+# Format: (rotation_0, rotation_1, rotation_2, rotation_3)
+# Each rotation is a 4x4 tuple grid where 1 = filled, 0 = empty
 PIECES = {
-    'I': [
-        [[0, 0, 0, 0],
-         [1, 1, 1, 1],
-         [0, 0, 0, 0],
-         [0, 0, 0, 0]],
-        
-        [[0, 0, 1, 0],
-         [0, 0, 1, 0],
-         [0, 0, 1, 0],
-         [0, 0, 1, 0]],
-        
-        [[0, 0, 0, 0],
-         [0, 0, 0, 0],
-         [1, 1, 1, 1],
-         [0, 0, 0, 0]],
-        
-        [[0, 1, 0, 0],
-         [0, 1, 0, 0],
-         [0, 1, 0, 0],
-         [0, 1, 0, 0]],
-    ],
-    'O': [
-        [[0, 1, 1, 0],
-         [0, 1, 1, 0],
-         [0, 0, 0, 0],
-         [0, 0, 0, 0]],
-    ] * 4,  # O piece doesn't rotate
-    'T': [
-        [[0, 1, 0, 0],
-         [1, 1, 1, 0],
-         [0, 0, 0, 0],
-         [0, 0, 0, 0]],
-        
-        [[0, 1, 0, 0],
-         [0, 1, 1, 0],
-         [0, 1, 0, 0],
-         [0, 0, 0, 0]],
-        
-        [[0, 0, 0, 0],
-         [1, 1, 1, 0],
-         [0, 1, 0, 0],
-         [0, 0, 0, 0]],
-        
-        [[0, 1, 0, 0],
-         [1, 1, 0, 0],
-         [0, 1, 0, 0],
-         [0, 0, 0, 0]],
-    ],
-    'S': [
-        [[0, 1, 1, 0],
-         [1, 1, 0, 0],
-         [0, 0, 0, 0],
-         [0, 0, 0, 0]],
-        
-        [[0, 1, 0, 0],
-         [0, 1, 1, 0],
-         [0, 0, 1, 0],
-         [0, 0, 0, 0]],
-        
-        [[0, 0, 0, 0],
-         [0, 1, 1, 0],
-         [1, 1, 0, 0],
-         [0, 0, 0, 0]],
-        
-        [[1, 0, 0, 0],
-         [1, 1, 0, 0],
-         [0, 1, 0, 0],
-         [0, 0, 0, 0]],
-    ],
-    'Z': [
-        [[1, 1, 0, 0],
-         [0, 1, 1, 0],
-         [0, 0, 0, 0],
-         [0, 0, 0, 0]],
-        
-        [[0, 0, 1, 0],
-         [0, 1, 1, 0],
-         [0, 1, 0, 0],
-         [0, 0, 0, 0]],
-        
-        [[0, 0, 0, 0],
-         [1, 1, 0, 0],
-         [0, 1, 1, 0],
-         [0, 0, 0, 0]],
-        
-        [[0, 1, 0, 0],
-         [1, 1, 0, 0],
-         [1, 0, 0, 0],
-         [0, 0, 0, 0]],
-    ],
-    'J': [
-        [[1, 0, 0, 0],
-         [1, 1, 1, 0],
-         [0, 0, 0, 0],
-         [0, 0, 0, 0]],
-        
-        [[0, 1, 1, 0],
-         [0, 1, 0, 0],
-         [0, 1, 0, 0],
-         [0, 0, 0, 0]],
-        
-        [[0, 0, 0, 0],
-         [1, 1, 1, 0],
-         [0, 0, 1, 0],
-         [0, 0, 0, 0]],
-        
-        [[0, 1, 0, 0],
-         [0, 1, 0, 0],
-         [1, 1, 0, 0],
-         [0, 0, 0, 0]],
-    ],
-    'L': [
-        [[0, 0, 1, 0],
-         [1, 1, 1, 0],
-         [0, 0, 0, 0],
-         [0, 0, 0, 0]],
-        
-        [[0, 1, 0, 0],
-         [0, 1, 0, 0],
-         [0, 1, 1, 0],
-         [0, 0, 0, 0]],
-        
-        [[0, 0, 0, 0],
-         [1, 1, 1, 0],
-         [1, 0, 0, 0],
-         [0, 0, 0, 0]],
-        
-        [[1, 1, 0, 0],
-         [0, 1, 0, 0],
-         [0, 1, 0, 0],
-         [0, 0, 0, 0]],
-    ],
+    'I': (
+        ((0, 0, 0, 0),
+         (1, 1, 1, 1),
+         (0, 0, 0, 0),
+         (0, 0, 0, 0)),
+        
+        ((0, 0, 1, 0),
+         (0, 0, 1, 0),
+         (0, 0, 1, 0),
+         (0, 0, 1, 0)),
+        
+        ((0, 0, 0, 0),
+         (0, 0, 0, 0),
+         (1, 1, 1, 1),
+         (0, 0, 0, 0)),
+        
+        ((0, 1, 0, 0),
+         (0, 1, 0, 0),
+         (0, 1, 0, 0),
+         (0, 1, 0, 0)),
+    ),
+    'O': (
+        ((0, 1, 1, 0),
+         (0, 1, 1, 0),
+         (0, 0, 0, 0),
+         (0, 0, 0, 0)),
+    ) * 4,  # O piece doesn't rotate (sharing is safe, tuples are immutable)
+    'T': (
+        ((0, 1, 0, 0),
+         (1, 1, 1, 0),
+         (0, 0, 0, 0),
+         (0, 0, 0, 0)),
+        
+        ((0, 1, 0, 0),
+         (0, 1, 1, 0),
+         (0, 1, 0, 0),
+         (0, 0, 0, 0)),
+        
+        ((0, 0, 0, 0),
+         (1, 1, 1, 0),
+         (0, 1, 0, 0),
+         (0, 0, 0, 0)),
+        
+        ((0, 1, 0, 0),
+         (1, 1, 0, 0),
+         (0, 1, 0, 0),
+         (0, 0, 0, 0)),
+    ),
+    'S': (
+        ((0, 1, 1, 0),
+         (1, 1, 0, 0),
+         (0, 0, 0, 0),
+         (0, 0, 0, 0)),
+        
+        ((0, 1, 0, 0),
+         (0, 1, 1, 0),
+         (0, 0, 1, 0),
+         (0, 0, 0, 0)),
+        
+        ((0, 0, 0, 0),
+         (0, 1, 1, 0),
+         (1, 1, 0, 0),
+         (0, 0, 0, 0)),
+        
+        ((1, 0, 0, 0),
+         (1, 1, 0, 0),
+         (0, 1, 0, 0),
+         (0, 0, 0, 0)),
+    ),
+    'Z': (
+        ((1, 1, 0, 0),
+         (0, 1, 1, 0),
+         (0, 0, 0, 0),
+         (0, 0, 0, 0)),
+        
+        ((0, 0, 1, 0),
+         (0, 1, 1, 0),
+         (0, 1, 0, 0),
+         (0, 0, 0, 0)),
+        
+        ((0, 0, 0, 0),
+         (1, 1, 0, 0),
+         (0, 1, 1, 0),
+         (0, 0, 0, 0)),
+        
+        ((0, 1, 0, 0),
+         (1, 1, 0, 0),
+         (1, 0, 0, 0),
+         (0, 0, 0, 0)),
+    ),
+    'J': (
+        ((1, 0, 0, 0),
+         (1, 1, 1, 0),
+         (0, 0, 0, 0),
+         (0, 0, 0, 0)),
+        
+        ((0, 1, 1, 0),
+         (0, 1, 0, 0),
+         (0, 1, 0, 0),
+         (0, 0, 0, 0)),
+        
+        ((0, 0, 0, 0),
+         (1, 1, 1, 0),
+         (0, 0, 1, 0),
+         (0, 0, 0, 0)),
+        
+        ((0, 1, 0, 0),
+         (0, 1, 0, 0),
+         (1, 1, 0, 0),
+         (0, 0, 0, 0)),
+    ),
+    'L': (
+        ((0, 0, 1, 0),
+         (1, 1, 1, 0),
+         (0, 0, 0, 0),
+         (0, 0, 0, 0)),
+        
+        ((0, 1, 0, 0),
+         (0, 1, 0, 0),
+         (0, 1, 1, 0),
+         (0, 0, 0, 0)),
+        
+        ((0, 0, 0, 0),
+         (1, 1, 1, 0),
+         (1, 0, 0, 0),
+         (0, 0, 0, 0)),
+        
+        ((1, 1, 0, 0),
+         (0, 1, 0, 0),
+         (0, 1, 0, 0),
+         (0, 0, 0, 0)),
+    ),
 }
 
+# Piece types in table order, and the same set for membership checks
+PIECE_TYPES = tuple(PIECES)
+_VALID_TYPES = frozenset(PIECES)
+
+
+def _occupied_cells(shape):
+    """Return the (row, col) cells set in a 4x4 shape matrix."""
+    return tuple(
+        (row, col)
+        for row in range(4)
+        for col in range(4)
+        if shape[row][col]
+    )
+
+
+# Occupied cells per piece type, indexed by rotation, computed once at import
+PIECE_CELLS = {
+    piece_type: tuple(_occupied_cells(shape) for shape in rotations)
+    for piece_type, rotations in PIECES.items()
+}
+
+
+def _cell_arrays(cells):
+    """Return cells as separate (rows, cols) index arrays."""
+    return (np.array([row for row, _ in cells], dtype=np.intp),
+            np.array([col for _, col in cells], dtype=np.intp))
+
+
+# Same cells as (rows, cols) index arrays for vectorized board access
+PIECE_CELL_ARRAYS = {
+    piece_type: tuple(_cell_arrays(cells) for cells in rotations)
+    for piece_type, rotations in PIECE_CELLS.items()
+}
+
+
+def _row_masks(cells):
+    """Return (row_offset, column_bitmask) pairs for each non-empty row."""
+    masks = {}
+    for row, col in cells:
+        masks[row] = masks.get(row, 0) | (1 << col)
+    return tuple(sorted(masks.items()))
+
+
+# Column bitmasks (bit n = column n) per row, used for bitboard collision
+PIECE_MASKS = {
+    piece_type: tuple(_row_masks(cells) for cells in rotations)
+    for piece_type, rotations in PIECE_CELLS.items()
+}
+
+
+def _bottom_profile(cells):
+    """Return (col_offset, lowest_row_offset) pairs for each occupied column."""
+    bottoms = {}
+    for row, col in cells:
+        bottoms[col] = max(bottoms.get(col, row), row)
+    return tuple(sorted(bottoms.items()))
+
+
+# Lowest occupied row per column, used to compute drop distance directly
+PIECE_BOTTOMS = {
+    piece_type: tuple(_bottom_profile(cells) for cells in rotations)
+    for piece_type, rotations in PIECE_CELLS.items()
+}
+
+
+def _bounds(cells):
+    """Return (min_col, max_col, min_row, max_row) of the occupied cells."""
+    rows = [row for row, _ in cells]
+    cols = [col for _, col in cells]
+    return (min(cols), max(cols), min(rows), max(rows))
+
+
+# Bounding box per rotation, used to reject off-board positions early
+PIECE_BOUNDS = {
+    piece_type: tuple(_bounds(cells) for cells in rotations)
+    for piece_type, rotations in PIECE_CELLS.items()
+}
+
+
+# SRS wall kick tests per (from_rotation, to_rotation), as published with
+# y pointing up. Rotation states: 0 = spawn, 1 = R, 2 = 180, 3 = L.
+_JLSTZ_KICKS = {
+    (0, 1): ((0, 0), (-1, 0), (-1, 1), (0, -2), (-1, -2)),
+    (1, 0): ((0, 0), (1, 0), (1, -1), (0, 2), (1, 2)),
+    (1, 2): ((0, 0), (1, 0), (1, -1), (0, 2), (1, 2)),
+    (2, 1): ((0, 0), (-1, 0), (-1, 1), (0, -2), (-1, -2)),
+    (2, 3): ((0, 0), (1, 0), (1, 1), (0, -2), (1, -2)),
+    (3, 2): ((0, 0), (-1, 0), (-1, -1), (0, 2), (-1, 2)),
+    (3, 0): ((0, 0), (-1, 0), (-1, -1), (0, 2), (-1, 2)),
+    (0, 3): ((0, 0), (1, 0), (1, 1), (0, -2), (1, -2)),
+}
+
+_I_KICKS = {
+    (0, 1): ((0, 0), (-2, 0), (1, 0), (-2, -1), (1, 2)),
+    (1, 0): ((0, 0), (2, 0), (-1, 0), (2, 1), (-1, -2)),
+    (1, 2): ((0, 0), (-1, 0), (2, 0), (-1, 2), (2, -1)),
+    (2, 1): ((0, 0), (1, 0), (-2, 0), (1, -2), (-2, 1)),
+    (2, 3): ((0, 0), (2, 0), (-1, 0), (2, 1), (-1, -2)),
+    (3, 2): ((0, 0), (-2, 0), (1, 0), (-2, -1), (1, 2)),
+    (3, 0): ((0, 0), (1, 0), (-2, 0), (1, -2), (-2, 1)),
+    (0, 3): ((0, 0), (-1, 0), (2, 0), (-1, 2), (2, -1)),
+}
+
+
+def _kick_table(piece_type):
+    """Return the SRS kick tests for a piece type, indexed [from][to]."""
+    if piece_type == 'O':
+        tests = {transition: ((0, 0),) for transition in _JLSTZ_KICKS}
+    else:
+        table = _I_KICKS if piece_type == 'I' else _JLSTZ_KICKS
+        # Board rows grow downward, so flip the y offsets
+        tests = {
+            transition: tuple((dx, -dy) for dx, dy in offsets)
+            for transition, offsets in table.items()
+        }
+    # Non-adjacent rotations have no kick tests
+    return tuple(
+        tuple(tests.get((from_rotation, to_rotation), ()) for to_rotation in range(4))
+        for from_rotation in range(4)
+    )
+
+
+# Wall kick (dx, dy) offsets, indexed [piece_type][from_rotation][to_rotation]
+SRS_KICKS = {piece_type: _kick_table(piece_type) for piece_type in PIECES}
+
 
 class Piece:
     """
@@ -161,6 +304,8 @@ class Piece:
     Single responsibility: Manage piece state and provide shape data.
     """
     
+    __slots__ = ('type', 'rotation', 'color', 'color_id')
+    
     def __init__(self, piece_type):
         """
         Initialize a new piece.
@@ -168,19 +313,36 @@ class Piece:
         Args:
             piece_type (str): One of 'I', 'O', 'T', 'S', 'Z', 'J', 'L'
         """
-        if piece_type not in PIECES:
+        if piece_type not in _VALID_TYPES:
             raise ValueError(f"Invalid piece type: {piece_type}")
         
         self.type = piece_type
         self.rotation = 0
         self.color = COLORS[piece_type]
+        self.color_id = COLOR_IDS[piece_type]
+    
+    @classmethod
+    def get(cls, piece_type):
+        """
+        Get the shared instance of a piece type in spawn rotation.
+        Shared instances are for display (queue, hold) and are never
+        rotated; the piece that moves on the board is one of the
+        engine's own pieces (see GameEngine._take_piece()).
+        
+        Args:
+            piece_type (str): One of 'I', 'O', 'T', 'S', 'Z', 'J', 'L'
+        
+        Returns:
+            Piece: Cached piece with rotation 0
+        """
+        return cls._pool[piece_type]
     
     def get_shape(self):
         """
         Get the current shape matrix based on rotation.
         
         Returns:
-            list[list[int]]: 4x4 matrix representing piece shape
+            tuple[tuple[int]]: 4x4 matrix representing piece shape
         """
         return PIECES[self.type][self.rotation]
     
@@ -198,15 +360,36 @@ class Piece:
         Coordinates are relative to piece's top-left corner.
         
         Returns:
-            list[tuple[int, int]]: List of (row, col) coordinates
-        """
-        shape = self.get_shape()
-        cells = []
-        for row in range(4):
-            for col in range(4):
-                if shape[row][col]:
-                    cells.append((row, col))
-        return cells
+            tuple[tuple[int, int]]: Cached (row, col) coordinates
+        """
+        return PIECE_CELLS[self.type][self.rotation]
+    
+    def get_cell_arrays(self):
+        """
+        Get occupied cells as separate row and column index arrays.
+        
+        Returns:
+            tuple[np.ndarray, np.ndarray]: Cached (rows, cols) arrays
+        """
+        return PIECE_CELL_ARRAYS[self.type][self.rotation]
+    
+    def get_row_masks(self):
+        """
+        Get per-row column bitmasks for the current rotation.
+        
+        Returns:
+            tuple[tuple[int, int]]: Cached (row_offset, bitmask) pairs
+        """
+        return PIECE_MASKS[self.type][self.rotation]
+    
+    def get_bottom_profile(self):
+        """
+        Get the lowest occupied row of each column for the current rotation.
+        
+        Returns:
+            tuple[tuple[int, int]]: Cached (col_offset, row_offset) pairs
+        """
+        return PIECE_BOTTOMS[self.type][self.rotation]
     
     def copy(self):
         """
@@ -219,3 +402,6 @@ class Piece:
         new_piece.rotation = self.rotation
         return new_piece
 
+
+# One shared instance per piece type, see Piece.get()
+Piece._pool = {piece_type: Piece(piece_type) for piece_type in PIECES}
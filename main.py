@@ -7,7 +7,6 @@ A modern Tetris game with LAN multiplayer support and TETR.IO-style preview.
 
 import argparse
 import sys
-from game_controller import GameController
 
 
 def parse_arguments():
@@ -75,11 +74,13 @@ Controls:
 
 def print_welcome():
     """Print welcome banner."""
-    print("=" * 60)
-    print("  TETRIS LAN MULTIPLAYER")
-    print("  TETR.IO Format - Next 2 Pieces Preview")
-    print("=" * 60)
-    print()
+    rule = "=" * 60
+    sys.stdout.write(
+        f"{rule}\n"
+        "  TETRIS LAN MULTIPLAYER\n"
+        "  TETR.IO Format - Next 2 Pieces Preview\n"
+        f"{rule}\n\n"
+    )
 
 
 def validate_args(args):
@@ -127,6 +128,9 @@ def main():
     
     # Create and run game controller
     try:
+        # Imported here so --help and bad arguments never load pygame
+        from game_controller import GameController
+        
         controller = GameController(
             mode=args.mode,
             host=args.host if args.mode == 'join' else None,
@@ -1,11 +1,30 @@
 """
 Networking package for LAN multiplayer.
 Handles server, client, and protocol for game synchronization.
-"""
 
-from .protocol import MessageType, GameMessage
-from .server import GameServer
-from .client import GameClient
+Submodules are imported on first use (PEP 562), so single player never
+loads the socket and threading code.
+"""
 
 __all__ = ['MessageType', 'GameMessage', 'GameServer', 'GameClient']
 
+
+def __getattr__(name):
+    """Import a public name from its submodule on first access."""
+    if name in ('MessageType', 'GameMessage'):
+        from . import protocol as module
+    elif name == 'GameServer':
+        from . import server as module
+    elif name == 'GameClient':
+        from . import client as module
+    else:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    
+    value = getattr(module, name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    """List the lazily imported names alongside the loaded ones."""
+    return sorted(set(globals()) | set(__all__))
@@ -3,12 +3,17 @@ LAN game client implementation.
 Connects to game server and handles communication.
 """
 
+import queue
 import socket
 import threading
 import time
 from .protocol import (
-    MessageType, GameMessage, create_connect_message,
-    create_state_update_message, create_game_over_message
+    GameMessage, FrameReader, create_connect_message,
+    create_state_update_message, create_state_delta_message,
+    create_game_over_message, create_ping_message, pack_state, unpack_state,
+    apply_state_delta, send_buffers, rearm_quickack,
+    SOCKET_BUFFER_SIZE, PING_INTERVAL, PEER_TIMEOUT,
+    TYPE_CONNECTED, TYPE_STATE_UPDATE, TYPE_STATE_DELTA, TYPE_GAME_OVER
 )
 
 
@@ -18,14 +23,37 @@ class GameClient:
     Single responsibility: Connect to server and handle communication.
     """
     
+    # Send a full state at least this often between deltas, so opponents
+    # that join late or miss a frame resynchronize
+    KEYFRAME_INTERVAL = 10
+    
     def __init__(self):
         """Initialize game client."""
         self.socket = None
         self.player_id = None
         self.connected = False
         self.opponent_state = None
+        self.opponent_id = None  # Player whose full state opponent_state is
         self.lock = threading.Lock()
         self.receive_thread = None
+        
+        # Outgoing frames are written by a background thread so a slow
+        # network never blocks the game loop
+        self.send_queue = queue.Queue(maxsize=4)
+        self.send_thread = None
+        
+        # Deltas sent since the last full state, and whether a dropped
+        # frame makes the next state a full one
+        self._deltas_since_keyframe = 0
+        self._keyframe_due = True
+        
+        # Message type -> handler(message); PONG needs none, any data
+        # arriving resets the receive timeout
+        self._handlers = {
+            TYPE_STATE_UPDATE: self._on_state_update,
+            TYPE_STATE_DELTA: self._on_state_delta,
+            TYPE_GAME_OVER: self._on_game_over,
+        }
     
     def connect(self, host, port, player_name="Player"):
         """
@@ -41,7 +69,14 @@ class GameClient:
         """
         try:
             self.socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+            # Set before connecting so the TCP window is negotiated for them
+            self.socket.setsockopt(socket.SOL_SOCKET, socket.SO_SNDBUF, SOCKET_BUFFER_SIZE)
+            self.socket.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, SOCKET_BUFFER_SIZE)
+            # The server answers every ping, so silence this long means it's gone
+            self.socket.settimeout(PEER_TIMEOUT)
             self.socket.connect((host, port))
+            # Send small state updates immediately instead of waiting on Nagle
+            self.socket.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
             
             # Send connect message
             msg = create_connect_message(player_name)
@@ -49,13 +84,15 @@ class GameClient:
             
             # Wait for connected response
             response = GameMessage.receive_from_socket(self.socket)
-            if response and response.type == MessageType.CONNECTED.value:
+            if response and response.type == TYPE_CONNECTED:
                 self.player_id = response.player_id
                 self.connected = True
                 
-                # Start receive thread
+                # Start receive and send threads
                 self.receive_thread = threading.Thread(target=self._receive_messages, daemon=True)
                 self.receive_thread.start()
+                self.send_thread = threading.Thread(target=self._send_messages, daemon=True)
+                self.send_thread.start()
                 
                 print(f"Connected to server as {self.player_id}")
                 return True
@@ -68,13 +105,17 @@ class GameClient:
     
     def _receive_messages(self):
         """Receive messages from server in background thread."""
+        reader = FrameReader(self.socket)
         while self.connected:
             try:
-                msg = GameMessage.receive_from_socket(self.socket)
-                if not msg:
+                messages = reader.read_messages()
+                if messages is None:
                     break
                 
-                self._process_message(msg)
+                rearm_quickack(self.socket)
+                
+                for msg in messages:
+                    self._process_message(msg)
             
             except Exception as e:
                 if self.connected:
@@ -84,6 +125,79 @@ class GameClient:
         self.connected = False
         print("Disconnected from server")
     
+    def _send_messages(self):
+        """Write queued frames and heartbeats to the server in background thread."""
+        ping = create_ping_message(self.player_id).to_buffers()
+        next_ping = time.monotonic()
+        stopping = False
+        while self.connected and not stopping:
+            try:
+                frame = self.send_queue.get(timeout=max(0.0, next_ping - time.monotonic()))
+            except queue.Empty:
+                frame = ()
+            if frame is None:
+                break
+            
+            # Coalesce frames queued in the meantime into one write
+            buffers = list(frame)
+            while True:
+                try:
+                    frame = self.send_queue.get_nowait()
+                except queue.Empty:
+                    break
+                if frame is None:
+                    stopping = True
+                    break
+                buffers.extend(frame)
+            
+            # Ping on schedule even while sending states, the server's
+            # replies are what keep our receive timeout from firing
+            now = time.monotonic()
+            if now >= next_ping:
+                buffers.extend(ping)
+                next_ping = now + PING_INTERVAL
+            
+            try:
+                send_buffers(self.socket, buffers)
+            except Exception as e:
+                if self.connected:
+                    print(f"Error sending message: {e}")
+                self.connected = False
+                break
+    
+    def _queue_frame(self, frame, droppable=True):
+        """
+        Queue an encoded frame for the send thread.
+        
+        Args:
+            frame (tuple[bytes, bytes]): Buffers from GameMessage.to_buffers(),
+                or None to stop the send thread
+            droppable (bool): If the queue is full, drop the oldest frame
+                instead of waiting for space
+        
+        Returns:
+            bool: True if the frame was queued
+        """
+        if not droppable:
+            try:
+                self.send_queue.put(frame, timeout=1.0)
+                return True
+            except queue.Full:
+                return False
+        
+        while True:
+            try:
+                self.send_queue.put_nowait(frame)
+                return True
+            except queue.Full:
+                # Newer state supersedes the oldest pending frame, which
+                # may be a delta, so resynchronize with a full state
+                try:
+                    self.send_queue.get_nowait()
+                    self._keyframe_due = True
+                except queue.Empty:
+                    pass
+    
     def _process_message(self, message):
         """
         Process a message from server.
@@ -91,13 +205,34 @@ class GameClient:
         Args:
             message (GameMessage): Received message
         """
-        if message.type == MessageType.STATE_UPDATE.value:
-            # Update opponent state
+        handler = self._handlers.get(message.type)
+        if handler:
+            handler(message)
+    
+    def _on_state_update(self, message):
+        """Replace the opponent state with a full state."""
+        state = message.data.get('state')
+        if state:
+            unpack_state(state)
+        with self.lock:
+            self.opponent_state = state
+            self.opponent_id = message.player_id
+    
+    def _on_state_delta(self, message):
+        """Patch the changed rows into the last full opponent state."""
+        delta = message.data.get('state')
+        # A delta only fits its own sender's board; other players' deltas
+        # wait for that player's next full state
+        if delta and message.player_id == self.opponent_id:
+            unpack_state(delta)
             with self.lock:
-                self.opponent_state = message.data.get('state')
-        
-        elif message.type == MessageType.GAME_OVER.value:
-            print(f"Opponent game over. Score: {message.data.get('score', 0)}")
+                state = apply_state_delta(self.opponent_state, delta)
+                if state is not None:
+                    self.opponent_state = state
+    
+    def _on_game_over(self, message):
+        """Report the opponent's game over."""
+        print(f"Opponent game over. Score: {message.data.get('score', 0)}")
     
     def send_state_update(self, game_state):
         """
@@ -112,14 +247,40 @@ class GameClient:
         if not self.connected:
             return False
         
-        try:
-            msg = create_state_update_message(self.player_id, game_state)
-            self.socket.sendall(msg.to_bytes())
-            return True
-        except Exception as e:
-            print(f"Error sending state update: {e}")
-            self.connected = False
+        msg = create_state_update_message(self.player_id, pack_state(game_state))
+        if not self._queue_frame(msg.to_buffers()):
             return False
+        self._deltas_since_keyframe = 0
+        self._keyframe_due = False
+        return True
+    
+    def send_state_delta(self, delta_state):
+        """
+        Send the changed part of the game state to server.
+        
+        Args:
+            delta_state (dict): State from GameEngine.get_state(delta=True)
+        
+        Returns:
+            bool: True if sent successfully
+        """
+        if not self.connected:
+            return False
+        
+        msg = create_state_delta_message(self.player_id, pack_state(delta_state))
+        if not self._queue_frame(msg.to_buffers()):
+            return False
+        self._deltas_since_keyframe += 1
+        return True
+    
+    def needs_keyframe(self):
+        """
+        Check whether the next state must be sent in full.
+        
+        Returns:
+            bool: True to use send_state_update(), False to send a delta
+        """
+        return self._keyframe_due or self._deltas_since_keyframe >= self.KEYFRAME_INTERVAL
     
     def send_game_over(self, final_score):
         """
@@ -134,13 +295,8 @@ class GameClient:
         if not self.connected:
             return False
         
-        try:
-            msg = create_game_over_message(self.player_id, final_score)
-            self.socket.sendall(msg.to_bytes())
-            return True
-        except Exception as e:
-            print(f"Error sending game over: {e}")
-            return False
+        msg = create_game_over_message(self.player_id, final_score)
+        return self._queue_frame(msg.to_buffers(), droppable=False)
     
     def get_opponent_state(self):
         """
@@ -153,9 +309,33 @@ class GameClient:
             return self.opponent_state
     
     def disconnect(self):
-        """Disconnect from server."""
+        """Disconnect from server, sending any frames still queued first."""
+        # The send thread writes everything queued before the sentinel
+        # (e.g. a game over sent right before quitting), then exits
+        if self.send_thread:
+            self._queue_frame(None, droppable=False)
+            self.send_thread.join(timeout=1.0)
+            self.send_thread = None
+        
+        if self.socket:
+            # Half-close so the server reads our frames and then EOF; its
+            # close in return ends the receive thread
+            try:
+                self.socket.shutdown(socket.SHUT_WR)
+            except OSError:
+                pass
+            if self.receive_thread:
+                self.receive_thread.join(timeout=1.0)
+                self.receive_thread = None
+        
         self.connected = False
+        
         if self.socket:
+            try:
+                # Wakes a receive thread the server didn't answer in time
+                self.socket.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
             try:
                 self.socket.close()
             except:
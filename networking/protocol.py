@@ -3,10 +3,46 @@ Network protocol definitions for LAN multiplayer.
 Defines message types and serialization.
 """
 
+import base64
 import json
-import time
+import socket
 from enum import Enum
 
+try:
+    import orjson
+except ImportError:  # Optional, the standard library encoder is used instead
+    orjson = None
+
+
+# Kernel send/receive buffer size for game sockets, room for bursts of
+# state updates without stalling the writer
+SOCKET_BUFFER_SIZE = 262144
+
+# Largest frame payload accepted (states are well under 1 KiB); a bigger
+# length prefix means a broken or hostile peer, not a real message
+MAX_FRAME_SIZE = 1 << 20
+
+# Clients ping the server this often (seconds); a peer that sends nothing
+# for PEER_TIMEOUT seconds is considered dead and disconnected
+PING_INTERVAL = 1.0
+PEER_TIMEOUT = 5.0
+
+
+def _dumps(obj):
+    """Encode an object as compact JSON bytes."""
+    if orjson is not None:
+        return orjson.dumps(obj)
+    return json.dumps(obj, separators=(',', ':')).encode('utf-8')
+
+
+def _loads(data):
+    """Decode JSON from str, bytes, bytearray or memoryview."""
+    if orjson is not None:
+        return orjson.loads(data)
+    if isinstance(data, memoryview):
+        data = data.tobytes()
+    return json.loads(data)
+
 
 class MessageType(Enum):
     """Enum for different message types."""
@@ -14,6 +50,7 @@ class MessageType(Enum):
     CONNECTED = "connected"
     INPUT = "input"
     STATE_UPDATE = "state_update"
+    STATE_DELTA = "state_delta"
     LINE_CLEAR = "line_clear"
     GAME_OVER = "game_over"
     DISCONNECT = "disconnect"
@@ -21,6 +58,16 @@ class MessageType(Enum):
     PONG = "pong"
 
 
+# Message type strings as received (GameMessage.type after decoding), so
+# handlers compare plain strings instead of looking up enum values
+TYPE_CONNECT = MessageType.CONNECT.value
+TYPE_CONNECTED = MessageType.CONNECTED.value
+TYPE_STATE_UPDATE = MessageType.STATE_UPDATE.value
+TYPE_STATE_DELTA = MessageType.STATE_DELTA.value
+TYPE_GAME_OVER = MessageType.GAME_OVER.value
+TYPE_PING = MessageType.PING.value
+
+
 class GameMessage:
     """
     Represents a network message.
@@ -39,7 +86,20 @@ class GameMessage:
         self.type = message_type
         self.player_id = player_id
         self.data = data or {}
-        self.timestamp = time.time()
+    
+    def _to_dict(self):
+        """
+        Build the JSON object sent for this message.
+        
+        Keys are single letters (t = type, p = player_id, d = data) and
+        empty fields are left out, since every frame carries them.
+        """
+        obj = {'t': self.type.value if isinstance(self.type, MessageType) else self.type}
+        if self.player_id is not None:
+            obj['p'] = self.player_id
+        if self.data:
+            obj['d'] = self.data
+        return obj
     
     def to_json(self):
         """
@@ -48,34 +108,27 @@ class GameMessage:
         Returns:
             str: JSON representation of message
         """
-        return json.dumps({
-            'type': self.type.value if isinstance(self.type, MessageType) else self.type,
-            'player_id': self.player_id,
-            'data': self.data,
-            'timestamp': self.timestamp,
-        })
+        return _dumps(self._to_dict()).decode('utf-8')
     
     @staticmethod
     def from_json(json_str):
         """
-        Deserialize message from JSON string.
+        Deserialize message from JSON.
         
         Args:
-            json_str (str): JSON string
+            json_str (str | bytes | memoryview): JSON text or UTF-8 encoded bytes
         
         Returns:
             GameMessage: Deserialized message
         """
         try:
-            obj = json.loads(json_str)
-            msg = GameMessage(
-                message_type=obj['type'],
-                player_id=obj.get('player_id'),
-                data=obj.get('data', {})
+            obj = _loads(json_str)
+            return GameMessage(
+                message_type=obj['t'],
+                player_id=obj.get('p'),
+                data=obj.get('d')
             )
-            msg.timestamp = obj.get('timestamp', time.time())
-            return msg
-        except (json.JSONDecodeError, KeyError) as e:
+        except (ValueError, KeyError) as e:
             print(f"Error deserializing message: {e}")
             return None
     
@@ -86,11 +139,17 @@ class GameMessage:
         Returns:
             bytes: Message as bytes with length prefix
         """
-        json_str = self.to_json()
-        json_bytes = json_str.encode('utf-8')
-        length = len(json_bytes)
-        # 4-byte length prefix + message
-        return length.to_bytes(4, byteorder='big') + json_bytes
+        return b''.join(self.to_buffers())
+    
+    def to_buffers(self):
+        """
+        Convert message to a length prefix and payload for a gathered write.
+        
+        Returns:
+            tuple[bytes, bytes]: 4-byte length prefix and the JSON payload
+        """
+        json_bytes = _dumps(self._to_dict())
+        return len(json_bytes).to_bytes(4, byteorder='big'), json_bytes
     
     @staticmethod
     def receive_from_socket(sock):
@@ -105,27 +164,167 @@ class GameMessage:
         """
         try:
             # Read 4-byte length prefix
-            length_bytes = sock.recv(4)
-            if not length_bytes or len(length_bytes) < 4:
+            length_bytes = _recv_exact(sock, 4)
+            if length_bytes is None:
                 return None
             
             length = int.from_bytes(length_bytes, byteorder='big')
+            if length > MAX_FRAME_SIZE:
+                print(f"Error receiving message: frame of {length} bytes is too large")
+                return None
             
             # Read the message
-            message_bytes = b''
-            while len(message_bytes) < length:
-                chunk = sock.recv(min(length - len(message_bytes), 4096))
-                if not chunk:
-                    return None
-                message_bytes += chunk
+            message_bytes = _recv_exact(sock, length)
+            if message_bytes is None:
+                return None
             
-            json_str = message_bytes.decode('utf-8')
-            return GameMessage.from_json(json_str)
+            return GameMessage.from_json(message_bytes)
         except Exception as e:
             print(f"Error receiving message: {e}")
             return None
 
 
+class FrameReader:
+    """
+    Buffers a connection's incoming bytes and splits them into messages.
+    Single responsibility: Parse length-prefixed frames from one socket.
+    """
+    
+    # Initial receive buffer size; one read can carry several frames
+    RECV_SIZE = 65536
+    
+    def __init__(self, sock):
+        """
+        Create a reader for a connected socket.
+        
+        Args:
+            sock (socket.socket): Socket to receive from
+        """
+        self.sock = sock
+        # Preallocated receive buffer, filled in place by recv_into()
+        self._buffer = bytearray(self.RECV_SIZE)
+        self._view = memoryview(self._buffer)
+        self._end = 0  # Bytes of the buffer holding received data
+    
+    def read_messages(self):
+        """
+        Wait for data, then return every complete message received so far.
+        
+        Returns:
+            list[GameMessage]: Parsed messages (empty while a frame is
+                incomplete), or None if the connection closed or failed
+        """
+        try:
+            received = self.sock.recv_into(self._view[self._end:])
+        except BlockingIOError:
+            # Non-blocking socket with nothing to read yet
+            return []
+        except OSError as e:
+            print(f"Error receiving message: {e}")
+            return None
+        if not received:
+            return None
+        
+        buffer = self._buffer
+        view = self._view
+        end = self._end + received
+        
+        messages = []
+        offset = 0
+        while end - offset >= 4:
+            length = int.from_bytes(view[offset:offset + 4], byteorder='big')
+            if length > MAX_FRAME_SIZE:
+                # Don't buffer whatever size an untrusted prefix claims
+                print(f"Error receiving message: frame of {length} bytes is too large")
+                return None
+            frame_end = offset + 4 + length
+            if frame_end > end:
+                break
+            
+            # Decode straight from the receive buffer
+            msg = GameMessage.from_json(view[offset + 4:frame_end])
+            if msg is None:
+                # The stream can't be trusted after a bad frame
+                return None
+            messages.append(msg)
+            offset = frame_end
+        
+        # Move the start of an incomplete frame to the front
+        if offset:
+            end -= offset
+            view[:end] = view[offset:offset + end]
+        self._end = end
+        
+        # Grow the buffer when the pending frame is larger than it
+        needed = 4 + int.from_bytes(view[:4], byteorder='big') if end >= 4 else 4
+        if needed > len(buffer):
+            view.release()
+            buffer.extend(bytearray(needed - len(buffer)))
+            self._view = memoryview(buffer)
+        
+        return messages
+
+
+def _recv_exact(sock, size):
+    """
+    Receive exactly size bytes from a socket.
+    
+    Args:
+        sock (socket.socket): Socket to receive from
+        size (int): Number of bytes to read
+    
+    Returns:
+        bytearray: Received bytes, or None if the connection closed
+    """
+    data = bytearray(size)
+    view = memoryview(data)
+    received = 0
+    while received < size:
+        chunk_size = sock.recv_into(view[received:])
+        if not chunk_size:
+            return None
+        received += chunk_size
+    return data
+
+
+def rearm_quickack(sock):
+    """
+    Keep acknowledging received data immediately.
+    
+    Linux falls back to delayed ACKs after each read, so TCP_QUICKACK is
+    set again after every read; other platforms don't have the option.
+    
+    Args:
+        sock (socket.socket): Socket that was just read from
+    """
+    if hasattr(socket, 'TCP_QUICKACK'):
+        sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_QUICKACK, 1)
+
+
+def send_buffers(sock, buffers):
+    """
+    Send buffers back to back, in a single gathered write where supported.
+    
+    Args:
+        sock (socket.socket): Socket to send on
+        buffers (tuple[bytes]): Buffers to send, e.g. from GameMessage.to_buffers()
+    """
+    # sendmsg() is not available on Windows
+    if not hasattr(sock, 'sendmsg'):
+        sock.sendall(b''.join(buffers))
+        return
+    
+    pending = [memoryview(buffer) for buffer in buffers]
+    while pending:
+        sent = sock.sendmsg(pending)
+        # Drop fully written buffers and trim a partially written one
+        while pending and sent >= len(pending[0]):
+            sent -= len(pending[0])
+            pending.pop(0)
+        if sent:
+            pending[0] = pending[0][sent:]
+
+
 def create_connect_message(player_name):
     """Create a connection request message."""
     return GameMessage(MessageType.CONNECT, data={'player_name': player_name})
@@ -145,6 +344,101 @@ def create_input_message(player_id, action, params=None):
     )
 
 
+# Last board encoded by pack_state() as (board, text), replaced as a whole
+# so threads never see a mismatched pair. GameEngine hands out the same
+# bytes object until a piece locks, so resends reuse the text.
+_encoded_board = (None, None)
+
+
+def _encode_board(board):
+    """Base64-encode packed board bytes, reusing the text of an unchanged board."""
+    global _encoded_board
+    if not isinstance(board, bytes):
+        # A bytearray may have changed in place since it was encoded
+        return base64.b64encode(board).decode('ascii')
+    cached_board, text = _encoded_board
+    if board is not cached_board:
+        text = base64.b64encode(board).decode('ascii')
+        _encoded_board = (board, text)
+    return text
+
+
+def pack_state(game_state):
+    """
+    Make a game state JSON-safe by base64-encoding the packed board bytes.
+    
+    Args:
+        game_state (dict): State from GameEngine.get_state()
+    
+    Returns:
+        dict: Copy of the state with a text board
+    """
+    board = game_state.get('board')
+    if isinstance(board, (bytes, bytearray)):
+        game_state = dict(game_state, board=_encode_board(board))
+    row_data = game_state.get('row_data')
+    if isinstance(row_data, (bytes, bytearray)):
+        game_state = dict(game_state, row_data=base64.b64encode(row_data).decode('ascii'))
+    return game_state
+
+
+def unpack_state(game_state):
+    """
+    Restore the packed board bytes of a state received over the network.
+    
+    Args:
+        game_state (dict): State produced by pack_state()
+    
+    Returns:
+        dict: State with the board as bytes (modified in place)
+    """
+    board = game_state.get('board')
+    if isinstance(board, str):
+        game_state['board'] = base64.b64decode(board)
+    row_data = game_state.get('row_data')
+    if isinstance(row_data, str):
+        game_state['row_data'] = base64.b64decode(row_data)
+    return game_state
+
+
+def apply_state_delta(base_state, delta_state):
+    """
+    Rebuild a full game state from the previous one and a delta.
+    
+    Args:
+        base_state (dict): Previous full state (unpacked), or None
+        delta_state (dict): State from GameEngine.get_state(delta=True) (unpacked)
+    
+    Returns:
+        dict: New full state, or None if there is no base board to patch
+    """
+    if not base_state or 'board' not in base_state:
+        return None
+    
+    board = bytearray(base_state['board'])
+    rows = delta_state.get('board_rows', 0)
+    row_data = delta_state.get('row_data', b'')
+    
+    # The changed rows are packed back to back, top to bottom
+    row_count = bin(rows).count('1')
+    if row_count:
+        row_size = len(row_data) // row_count
+        offset = 0
+        row = 0
+        while rows:
+            if rows & 1:
+                start = row * row_size
+                board[start:start + row_size] = row_data[offset:offset + row_size]
+                offset += row_size
+            rows >>= 1
+            row += 1
+    
+    state = dict(delta_state, board=bytes(board))
+    state.pop('board_rows', None)
+    state.pop('row_data', None)
+    return state
+
+
 def create_state_update_message(player_id, game_state):
     """Create a game state update message."""
     return GameMessage(
@@ -154,6 +448,15 @@ def create_state_update_message(player_id, game_state):
     )
 
 
+def create_state_delta_message(player_id, delta_state):
+    """Create a game state delta message (changed board rows only)."""
+    return GameMessage(
+        MessageType.STATE_DELTA,
+        player_id=player_id,
+        data={'state': delta_state}
+    )
+
+
 def create_game_over_message(player_id, final_score):
     """Create a game over message."""
     return GameMessage(
@@ -162,3 +465,12 @@ def create_game_over_message(player_id, final_score):
         data={'score': final_score}
     )
 
+
+def create_ping_message(player_id):
+    """Create a heartbeat message."""
+    return GameMessage(MessageType.PING, player_id=player_id)
+
+
+def create_pong_message():
+    """Create a heartbeat reply message."""
+    return GameMessage(MessageType.PONG)
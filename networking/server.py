@@ -3,10 +3,42 @@ LAN game server implementation.
 Manages client connections and game state synchronization.
 """
 
+import selectors
 import socket
 import threading
 import time
-from .protocol import MessageType, GameMessage, create_connected_message, create_state_update_message
+from collections import OrderedDict
+from .protocol import (
+    FrameReader, create_connected_message, create_state_update_message,
+    create_pong_message, pack_state, unpack_state, apply_state_delta,
+    rearm_quickack, SOCKET_BUFFER_SIZE, PEER_TIMEOUT,
+    TYPE_CONNECT, TYPE_STATE_UPDATE, TYPE_STATE_DELTA, TYPE_GAME_OVER, TYPE_PING
+)
+
+
+class _Connection:
+    """
+    Server-side state of one client socket.
+    Single responsibility: Hold a connection's read and write buffers.
+    """
+    
+    __slots__ = ('sock', 'address', 'player_id', 'reader', 'outbox', 'writing', 'closed')
+    
+    def __init__(self, sock, address):
+        """
+        Wrap a newly accepted client socket.
+        
+        Args:
+            sock (socket.socket): Non-blocking client socket
+            address (tuple): Client address
+        """
+        self.sock = sock
+        self.address = address
+        self.player_id = None  # Assigned once the CONNECT message arrives
+        self.reader = FrameReader(sock)
+        self.outbox = bytearray()  # Encoded frames the socket hasn't taken yet
+        self.writing = False  # Registered for EVENT_WRITE
+        self.closed = False
 
 
 class GameServer:
@@ -15,6 +47,12 @@ class GameServer:
     Single responsibility: Manage client connections and state broadcasting.
     """
     
+    # Seconds the event loop waits for activity before checking for stop()
+    SELECT_TIMEOUT = 0.5
+    
+    # Drop a client whose unsent frames pile up past this many bytes
+    MAX_OUTBOX = 1 << 20
+    
     def __init__(self, host='0.0.0.0', port=5555):
         """
         Initialize game server.
@@ -26,165 +64,315 @@ class GameServer:
         self.host = host
         self.port = port
         self.server_socket = None
-        self.clients = {}  # player_id -> socket
-        self.player_states = {}  # player_id -> game_state
+        self.selector = None
+        self.serve_thread = None
+        self.clients = {}  # player_id -> _Connection
+        self.player_states = {}  # player_id -> latest full game_state (unpacked)
+        # _Connection -> time its last data arrived, least recent first; all
+        # connections share PEER_TIMEOUT, so the front expires first
+        self._last_seen = OrderedDict()
+        self._pong = create_pong_message().to_buffers()
+        # Message type -> handler(conn, message) for registered players
+        self._handlers = {
+            TYPE_STATE_UPDATE: self._on_state_update,
+            TYPE_STATE_DELTA: self._on_state_delta,
+            TYPE_GAME_OVER: self._on_game_over,
+            TYPE_PING: self._on_ping,
+        }
         self.running = False
         self.next_player_id = 1
+        # Only the event loop changes clients; the lock is for other threads
         self.lock = threading.Lock()
     
     def start(self):
         """Start the server and begin accepting connections."""
         self.server_socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
         self.server_socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        # Accepted sockets inherit the buffer sizes of the listening socket
+        self.server_socket.setsockopt(socket.SOL_SOCKET, socket.SO_SNDBUF, SOCKET_BUFFER_SIZE)
+        self.server_socket.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, SOCKET_BUFFER_SIZE)
         self.server_socket.bind((self.host, self.port))
         self.server_socket.listen(5)
+        self.server_socket.setblocking(False)
+        
+        self.selector = selectors.DefaultSelector()
+        self.selector.register(self.server_socket, selectors.EVENT_READ)
         self.running = True
         
         print(f"Server started on {self.host}:{self.port}")
         
-        # Start accept thread
-        accept_thread = threading.Thread(target=self._accept_connections, daemon=True)
-        accept_thread.start()
+        # One thread serves every connection (epoll/kqueue/select)
+        self.serve_thread = threading.Thread(target=self._serve, daemon=True)
+        self.serve_thread.start()
     
-    def _accept_connections(self):
-        """Accept incoming client connections."""
+    def _serve(self):
+        """Run the event loop: accept, read and write all connections."""
         while self.running:
             try:
-                self.server_socket.settimeout(1.0)
-                client_socket, address = self.server_socket.accept()
-                print(f"New connection from {address}")
+                events = self.selector.select(timeout=self.SELECT_TIMEOUT)
+            except OSError:
+                break
+            
+            for key, mask in events:
+                conn = key.data
+                if conn is None:
+                    self._accept_connection()
+                    continue
                 
-                # Handle client in new thread
-                client_thread = threading.Thread(
-                    target=self._handle_client,
-                    args=(client_socket, address),
-                    daemon=True
-                )
-                client_thread.start()
-            except socket.timeout:
-                continue
-            except Exception as e:
-                if self.running:
-                    print(f"Error accepting connection: {e}")
-    
-    def _handle_client(self, client_socket, address):
-        """
-        Handle a connected client.
+                try:
+                    if mask & selectors.EVENT_WRITE:
+                        self._flush(conn)
+                    if mask & selectors.EVENT_READ and not conn.closed:
+                        self._read(conn)
+                except Exception as e:
+                    print(f"Error handling client {conn.player_id}: {e}")
+                    self._close_connection(conn)
+            
+            self._close_idle_connections()
+        
+        # Close all client connections
+        for conn in list(self.clients.values()):
+            self._close_connection(conn)
+    
+    def _accept_connection(self):
+        """Accept an incoming client connection."""
+        try:
+            client_socket, address = self.server_socket.accept()
+        except BlockingIOError:
+            return
+        except OSError as e:
+            if self.running:
+                print(f"Error accepting connection: {e}")
+            return
+        
+        print(f"New connection from {address}")
+        
+        # Relay small state updates immediately instead of waiting on Nagle
+        client_socket.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        client_socket.setsockopt(socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1)
+        client_socket.setblocking(False)
+        
+        conn = _Connection(client_socket, address)
+        self.selector.register(client_socket, selectors.EVENT_READ, conn)
+        self._last_seen[conn] = time.monotonic()
+    
+    def _close_idle_connections(self):
+        """Disconnect clients that have sent nothing for PEER_TIMEOUT seconds."""
+        deadline = time.monotonic() - PEER_TIMEOUT
+        while self._last_seen:
+            conn, last_seen = next(iter(self._last_seen.items()))
+            if last_seen > deadline:
+                break
+            print(f"Connection {conn.player_id or conn.address} timed out")
+            self._close_connection(conn)
+    
+    def _read(self, conn):
+        """
+        Read and handle every complete message waiting on a connection.
         
         Args:
-            client_socket (socket.socket): Client socket
-            address (tuple): Client address
+            conn (_Connection): Readable connection
         """
-        player_id = None
+        messages = conn.reader.read_messages()
+        if messages is None:
+            self._close_connection(conn)
+            return
         
-        try:
-            # Wait for connect message
-            msg = GameMessage.receive_from_socket(client_socket)
-            if not msg or msg.type != MessageType.CONNECT.value:
-                client_socket.close()
-                return
-            
-            # Assign player ID
-            with self.lock:
-                player_id = f"player_{self.next_player_id}"
-                self.next_player_id += 1
-                self.clients[player_id] = client_socket
-                self.player_states[player_id] = None
-            
-            # Send connection confirmation
-            response = create_connected_message(player_id)
-            client_socket.sendall(response.to_bytes())
-            
-            print(f"Player {player_id} connected from {address}")
-            
-            # Handle client messages
-            while self.running:
-                msg = GameMessage.receive_from_socket(client_socket)
-                if not msg:
-                    break
-                
-                self._process_message(player_id, msg)
+        rearm_quickack(conn.sock)
         
-        except Exception as e:
-            print(f"Error handling client {player_id}: {e}")
+        self._last_seen[conn] = time.monotonic()
+        self._last_seen.move_to_end(conn)
         
-        finally:
-            # Cleanup
-            with self.lock:
-                if player_id in self.clients:
-                    del self.clients[player_id]
-                if player_id in self.player_states:
-                    del self.player_states[player_id]
-            
-            try:
-                client_socket.close()
-            except:
-                pass
-            
-            print(f"Player {player_id} disconnected")
+        for msg in messages:
+            if conn.closed:
+                break
+            if conn.player_id is None:
+                self._register_player(conn, msg)
+            else:
+                self._process_message(conn, msg)
+    
+    def _register_player(self, conn, message):
+        """
+        Handle a connection's first message, which must be CONNECT.
+        
+        Args:
+            conn (_Connection): Connection without a player yet
+            message (GameMessage): First message received
+        """
+        if message.type != TYPE_CONNECT:
+            self._close_connection(conn)
+            return
+        
+        # Assign player ID
+        player_id = f"player_{self.next_player_id}"
+        self.next_player_id += 1
+        conn.player_id = player_id
+        
+        # Send connection confirmation, then the other players' current boards
+        self._send(conn, create_connected_message(player_id).to_buffers())
+        for other_id, state in self.player_states.items():
+            if state:
+                msg = create_state_update_message(other_id, pack_state(state))
+                self._send(conn, msg.to_buffers())
+        
+        # A failed send has already closed the connection
+        if conn.closed:
+            return
+        
+        with self.lock:
+            self.clients[player_id] = conn
+        self.player_states[player_id] = None
+        
+        print(f"Player {player_id} connected from {conn.address}")
     
-    def _process_message(self, player_id, message):
+    def _process_message(self, conn, message):
         """
         Process a message from a client.
         
         Args:
-            player_id (str): ID of the player
+            conn (_Connection): Connection of the sending player
             message (GameMessage): Received message
         """
-        if message.type == MessageType.STATE_UPDATE.value:
-            # Update player state and broadcast to others
-            with self.lock:
-                self.player_states[player_id] = message.data.get('state')
-            
-            self._broadcast_state_update(player_id)
+        handler = self._handlers.get(message.type)
+        if handler:
+            handler(conn, message)
+    
+    def _on_state_update(self, conn, message):
+        """Keep the full state for players who join later, then relay it."""
+        player_id = conn.player_id
+        state = message.data.get('state')
+        if state:
+            self.player_states[player_id] = unpack_state(dict(state))
         
-        elif message.type == MessageType.GAME_OVER.value:
-            print(f"Player {player_id} game over. Score: {message.data.get('score', 0)}")
-            # Could implement game over logic here
+        self._broadcast_message(player_id, message)
+    
+    def _on_state_delta(self, conn, message):
+        """Rebuild the full state from a delta, then relay the delta."""
+        player_id = conn.player_id
+        delta = message.data.get('state')
+        if delta:
+            state = apply_state_delta(
+                self.player_states.get(player_id), unpack_state(dict(delta))
+            )
+            if state is not None:
+                self.player_states[player_id] = state
+        
+        self._broadcast_message(player_id, message)
+    
+    def _on_game_over(self, conn, message):
+        """Report a player's game over."""
+        print(f"Player {conn.player_id} game over. Score: {message.data.get('score', 0)}")
+        # Could implement game over logic here
     
-    def _broadcast_state_update(self, sending_player_id):
+    def _on_ping(self, conn, message):
+        """Answer a heartbeat."""
+        self._send(conn, self._pong)
+    
+    def _broadcast_message(self, sending_player_id, msg):
         """
-        Broadcast player state to other connected clients.
+        Send a message to every client except its sender.
         
         Args:
-            sending_player_id (str): ID of player whose state to broadcast
+            sending_player_id (str): ID of the player the message came from
+            msg (GameMessage): Message to relay
         """
-        with self.lock:
-            state = self.player_states.get(sending_player_id)
-            if not state:
-                return
-            
-            msg = create_state_update_message(sending_player_id, state)
-            msg_bytes = msg.to_bytes()
-            
-            # Send to all other clients
-            for player_id, client_socket in list(self.clients.items()):
-                if player_id != sending_player_id:
-                    try:
-                        client_socket.sendall(msg_bytes)
-                    except Exception as e:
-                        print(f"Error broadcasting to {player_id}: {e}")
+        # Encode once for every recipient
+        buffers = msg.to_buffers()
+        
+        for player_id, conn in list(self.clients.items()):
+            if player_id != sending_player_id:
+                self._send(conn, buffers)
+    
+    def _send(self, conn, buffers):
+        """
+        Queue encoded buffers on a connection and write what the socket takes.
+        
+        Args:
+            conn (_Connection): Destination connection
+            buffers (tuple[bytes]): Encoded frame, e.g. from GameMessage.to_buffers()
+        """
+        if conn.closed:
+            return
+        
+        backlog = bool(conn.outbox)
+        for buffer in buffers:
+            conn.outbox += buffer
+        
+        if len(conn.outbox) > self.MAX_OUTBOX:
+            print(f"Error broadcasting to {conn.player_id}: client is not reading")
+            self._close_connection(conn)
+        elif not backlog:
+            # Otherwise the pending EVENT_WRITE flushes it in order
+            self._flush(conn)
+    
+    def _flush(self, conn):
+        """
+        Write as much of a connection's outbox as the socket accepts.
+        
+        Args:
+            conn (_Connection): Connection with pending output
+        """
+        try:
+            sent = conn.sock.send(conn.outbox)
+        except BlockingIOError:
+            sent = 0
+        except OSError as e:
+            print(f"Error broadcasting to {conn.player_id}: {e}")
+            self._close_connection(conn)
+            return
+        del conn.outbox[:sent]
+        
+        # Only wait for writability while there is something left to send
+        writing = bool(conn.outbox)
+        if writing != conn.writing:
+            events = selectors.EVENT_READ | selectors.EVENT_WRITE if writing else selectors.EVENT_READ
+            self.selector.modify(conn.sock, events, conn)
+            conn.writing = writing
+    
+    def _close_connection(self, conn):
+        """
+        Close a connection and forget its player.
+        
+        Args:
+            conn (_Connection): Connection to close
+        """
+        if conn.closed:
+            return
+        conn.closed = True
+        self._last_seen.pop(conn, None)
+        
+        try:
+            self.selector.unregister(conn.sock)
+        except (KeyError, ValueError):
+            pass
+        try:
+            conn.sock.close()
+        except OSError:
+            pass
+        
+        if conn.player_id is not None:
+            with self.lock:
+                self.clients.pop(conn.player_id, None)
+            self.player_states.pop(conn.player_id, None)
+            print(f"Player {conn.player_id} disconnected")
     
     def stop(self):
         """Stop the server and close all connections."""
         print("Stopping server...")
         self.running = False
         
-        # Close all client connections
-        with self.lock:
-            for client_socket in self.clients.values():
-                try:
-                    client_socket.close()
-                except:
-                    pass
-            self.clients.clear()
+        # The event loop closes the client connections on its way out
+        if self.serve_thread:
+            self.serve_thread.join(timeout=self.SELECT_TIMEOUT * 4)
         
         # Close server socket
         if self.server_socket:
             try:
                 self.server_socket.close()
-            except:
+            except OSError:
                 pass
+        if self.selector:
+            self.selector.close()
         
         print("Server stopped")
     
@@ -197,4 +385,3 @@ class GameServer:
         """
         with self.lock:
             return len(self.clients)
-
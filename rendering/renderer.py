@@ -3,8 +3,9 @@ Main renderer for Tetris game using pygame.
 Handles all visual elements including board, pieces, UI, and preview.
 """
 
+import numpy as np
 import pygame
-from game_logic.pieces import COLORS
+from game_logic.pieces import COLORS, PALETTE
 from game_logic.board import Board
 
 
@@ -21,6 +22,9 @@ class Renderer:
     PREVIEW_SIZE = 4 * CELL_SIZE
     HOLD_SIZE = 4 * CELL_SIZE
     SIDEBAR_WIDTH = 200
+    MINI_CELL_SIZE = 10
+    MINI_WIDTH = Board.WIDTH * MINI_CELL_SIZE
+    MINI_HEIGHT = Board.HEIGHT * MINI_CELL_SIZE
     WINDOW_WIDTH = SIDEBAR_WIDTH + BOARD_WIDTH + SIDEBAR_WIDTH
     WINDOW_HEIGHT = BOARD_HEIGHT + 100
     
@@ -30,6 +34,9 @@ class Renderer:
     TEXT_COLOR = (255, 255, 255)
     BORDER_COLOR = (100, 100, 100)
     
+    # Rendered text surfaces kept before the cache is cleared
+    TEXT_CACHE_SIZE = 256
+    
     def __init__(self):
         """Initialize pygame and create display window."""
         pygame.init()
@@ -40,10 +47,122 @@ class Renderer:
         self.font_large = pygame.font.Font(None, 48)
         self.font_medium = pygame.font.Font(None, 36)
         self.font_small = pygame.font.Font(None, 24)
+        # (font, text, color) -> rendered surface, see _render_text()
+        self._text_cache = {}
         
         # Board position (centered)
         self.board_x = self.SIDEBAR_WIDTH
         self.board_y = 50
+        
+        # Opponent's mini board (bottom right corner)
+        self.mini_x = self.board_x + self.BOARD_WIDTH + 20
+        self.mini_y = self.WINDOW_HEIGHT - self.MINI_HEIGHT - 50
+        
+        # Screen rect of every board cell, indexed [row][col]; built once
+        # instead of allocating a Rect per cell every frame
+        self._cell_rects = self._build_cell_rects(self.board_x, self.board_y, self.CELL_SIZE)
+        
+        # What the last frame showed, to skip redrawing an unchanged frame
+        self._last_frame = None
+        self._last_opponent_state = None
+        
+        # Dimming layer for the pause and game over screens, converted to
+        # the display format once so blitting it skips pixel conversion
+        self._overlay = pygame.Surface((self.WINDOW_WIDTH, self.WINDOW_HEIGHT)).convert()
+        self._overlay.fill((0, 0, 0))
+        self._overlay.set_alpha(200)
+        
+        # Border and grid lines never change, so draw them once
+        self._grid_surface = self._build_grid_surface()
+        
+        # Prerendered cell per color id (fill and grid outline), blitted
+        # instead of drawing two rects per cell
+        self._tiles = tuple(self._build_tile(color) for color in PALETTE)
+        
+        # Opponent's board image, rebuilt from the color ids with NumPy
+        # only when their board changes (empty cells show the background)
+        self._mini_palette = np.array((self.BG_COLOR,) + PALETTE[1:], dtype=np.uint8)
+        self._opponent_surface = pygame.Surface((self.MINI_WIDTH, self.MINI_HEIGHT)).convert()
+        self._opponent_board = None  # Board bytes shown on _opponent_surface
+    
+    @staticmethod
+    def _build_cell_rects(x, y, cell_size):
+        """
+        Build the screen rect of every cell of a board drawn at (x, y).
+        
+        Args:
+            x (int): Board X position
+            y (int): Board Y position
+            cell_size (int): Cell size in pixels
+        
+        Returns:
+            list[list[pygame.Rect]]: Cell rects indexed [row][col]
+        """
+        return [
+            [
+                pygame.Rect(x + col * cell_size, y + row * cell_size, cell_size, cell_size)
+                for col in range(Board.WIDTH)
+            ]
+            for row in range(Board.HEIGHT)
+        ]
+    
+    def _build_grid_surface(self):
+        """
+        Draw the board border and empty grid onto their own surface.
+        
+        Returns:
+            pygame.Surface: Grid image, blitted at (board_x - 2, board_y - 2)
+        """
+        surface = pygame.Surface((self.BOARD_WIDTH + 4, self.BOARD_HEIGHT + 4)).convert()
+        surface.fill(self.BG_COLOR)
+        pygame.draw.rect(surface, self.BORDER_COLOR, surface.get_rect(), 2)
+        
+        for row in range(Board.HEIGHT):
+            for col in range(Board.WIDTH):
+                cell_rect = pygame.Rect(
+                    2 + col * self.CELL_SIZE, 2 + row * self.CELL_SIZE,
+                    self.CELL_SIZE, self.CELL_SIZE
+                )
+                pygame.draw.rect(surface, self.GRID_COLOR, cell_rect, 1)
+        
+        return surface
+    
+    def _render_text(self, font, text, color):
+        """
+        Render text, reusing the surface from an earlier identical call.
+        
+        Args:
+            font (pygame.font.Font): Font to render with
+            text (str): Text to render
+            color (tuple): RGB text color
+        
+        Returns:
+            pygame.Surface: Rendered text
+        """
+        key = (font, text, color)
+        surface = self._text_cache.get(key)
+        if surface is None:
+            # Scores keep changing, so don't let old values pile up
+            if len(self._text_cache) >= self.TEXT_CACHE_SIZE:
+                self._text_cache.clear()
+            surface = font.render(text, True, color)
+            self._text_cache[key] = surface
+        return surface
+    
+    def _build_tile(self, color):
+        """
+        Draw a single filled cell with its grid outline onto its own surface.
+        
+        Args:
+            color (tuple): RGB fill color
+        
+        Returns:
+            pygame.Surface: Cell image
+        """
+        tile = pygame.Surface((self.CELL_SIZE, self.CELL_SIZE)).convert()
+        tile.fill(color)
+        pygame.draw.rect(tile, self.GRID_COLOR, tile.get_rect(), 1)
+        return tile
     
     def render(self, game_engine, opponent_state=None):
         """
@@ -53,6 +172,14 @@ class Renderer:
             game_engine (GameEngine): Current game state
             opponent_state (dict, optional): Opponent's game state for multiplayer
         """
+        # The window keeps the last frame, so only redraw when the game or
+        # the opponent's state (replaced on every update) has changed
+        frame = (game_engine, game_engine.state_version, game_engine.paused, game_engine.game_over)
+        if frame == self._last_frame and opponent_state is self._last_opponent_state:
+            return
+        self._last_frame = frame
+        self._last_opponent_state = opponent_state
+        
         self.screen.fill(self.BG_COLOR)
         
         # Draw main components
@@ -79,31 +206,16 @@ class Renderer:
         """Draw the main game board with grid and placed pieces."""
         board = game_engine.board
         
-        # Draw border
-        border_rect = pygame.Rect(
-            self.board_x - 2,
-            self.board_y - 2,
-            self.BOARD_WIDTH + 4,
-            self.BOARD_HEIGHT + 4
-        )
-        pygame.draw.rect(self.screen, self.BORDER_COLOR, border_rect, 2)
+        # Draw border and grid lines
+        self.screen.blit(self._grid_surface, (self.board_x - 2, self.board_y - 2))
         
-        # Draw cells
+        # Draw filled cells
+        grid = board.grid.tolist()
         for row in range(Board.HEIGHT):
             for col in range(Board.WIDTH):
-                x = self.board_x + col * self.CELL_SIZE
-                y = self.board_y + row * self.CELL_SIZE
-                
-                # Draw cell background
-                cell_rect = pygame.Rect(x, y, self.CELL_SIZE, self.CELL_SIZE)
-                
-                if board.grid[row][col] is not None:
-                    # Draw filled cell
-                    pygame.draw.rect(self.screen, board.grid[row][col], cell_rect)
-                    pygame.draw.rect(self.screen, self.GRID_COLOR, cell_rect, 1)
-                else:
-                    # Draw grid line
-                    pygame.draw.rect(self.screen, self.GRID_COLOR, cell_rect, 1)
+                color_id = grid[row][col]
+                if color_id:
+                    self.screen.blit(self._tiles[color_id], self._cell_rects[row][col])
     
     def _draw_current_piece(self, game_engine):
         """Draw the currently active piece."""
@@ -112,18 +224,14 @@ class Renderer:
         
         piece = game_engine.current_piece
         cells = piece.get_occupied_cells()
+        tile = self._tiles[piece.color_id]
         
         for cell_row, cell_col in cells:
             board_row = game_engine.piece_y + cell_row
             board_col = game_engine.piece_x + cell_col
             
             if 0 <= board_row < Board.HEIGHT and 0 <= board_col < Board.WIDTH:
-                x = self.board_x + board_col * self.CELL_SIZE
-                y = self.board_y + board_row * self.CELL_SIZE
-                
-                cell_rect = pygame.Rect(x, y, self.CELL_SIZE, self.CELL_SIZE)
-                pygame.draw.rect(self.screen, piece.color, cell_rect)
-                pygame.draw.rect(self.screen, self.GRID_COLOR, cell_rect, 1)
+                self.screen.blit(tile, self._cell_rects[board_row][board_col])
     
     def _draw_ghost_piece(self, game_engine):
         """Draw ghost piece showing where current piece will land."""
@@ -139,16 +247,13 @@ class Renderer:
             board_col = game_engine.piece_x + cell_col
             
             if 0 <= board_row < Board.HEIGHT and 0 <= board_col < Board.WIDTH:
-                x = self.board_x + board_col * self.CELL_SIZE
-                y = self.board_y + board_row * self.CELL_SIZE
-                
-                cell_rect = pygame.Rect(x, y, self.CELL_SIZE, self.CELL_SIZE)
+                cell_rect = self._cell_rects[board_row][board_col]
                 pygame.draw.rect(self.screen, COLORS['GHOST'], cell_rect, 2)
     
     def _draw_hold_piece(self, game_engine):
         """Draw the held piece in the left sidebar."""
         # Draw label
-        label = self.font_small.render("HOLD", True, self.TEXT_COLOR)
+        label = self._render_text(self.font_small, "HOLD", self.TEXT_COLOR)
         self.screen.blit(label, (20, self.board_y))
         
         # Draw hold box
@@ -164,7 +269,7 @@ class Renderer:
     def _draw_next_pieces(self, game_engine):
         """Draw the next 2 pieces in the right sidebar (TETR.IO format)."""
         # Draw label
-        label = self.font_small.render("NEXT", True, self.TEXT_COLOR)
+        label = self._render_text(self.font_small, "NEXT", self.TEXT_COLOR)
         label_x = self.board_x + self.BOARD_WIDTH + 20
         self.screen.blit(label, (label_x, self.board_y))
         
@@ -204,13 +309,11 @@ class Renderer:
             offset_x = (self.PREVIEW_SIZE - piece_width) // 2 - min_col * self.CELL_SIZE
             offset_y = (self.PREVIEW_SIZE - piece_height) // 2 - min_row * self.CELL_SIZE
             
+            tile = self._tiles[piece.color_id]
             for cell_row, cell_col in cells:
                 cell_x = x + offset_x + cell_col * self.CELL_SIZE
                 cell_y = y + offset_y + cell_row * self.CELL_SIZE
-                
-                cell_rect = pygame.Rect(cell_x, cell_y, self.CELL_SIZE, self.CELL_SIZE)
-                pygame.draw.rect(self.screen, piece.color, cell_rect)
-                pygame.draw.rect(self.screen, self.GRID_COLOR, cell_rect, 1)
+                self.screen.blit(tile, (cell_x, cell_y))
     
     def _draw_stats(self, game_engine):
         """Draw score, lines, and level statistics."""
@@ -218,20 +321,20 @@ class Renderer:
         stats_y = self.board_y + 300
         
         # Score
-        score_label = self.font_small.render("SCORE", True, self.TEXT_COLOR)
-        score_value = self.font_medium.render(str(game_engine.score), True, self.TEXT_COLOR)
+        score_label = self._render_text(self.font_small, "SCORE", self.TEXT_COLOR)
+        score_value = self._render_text(self.font_medium, str(game_engine.score), self.TEXT_COLOR)
         self.screen.blit(score_label, (stats_x, stats_y))
         self.screen.blit(score_value, (stats_x, stats_y + 25))
         
         # Lines
-        lines_label = self.font_small.render("LINES", True, self.TEXT_COLOR)
-        lines_value = self.font_medium.render(str(game_engine.lines_cleared), True, self.TEXT_COLOR)
+        lines_label = self._render_text(self.font_small, "LINES", self.TEXT_COLOR)
+        lines_value = self._render_text(self.font_medium, str(game_engine.lines_cleared), self.TEXT_COLOR)
         self.screen.blit(lines_label, (stats_x, stats_y + 70))
         self.screen.blit(lines_value, (stats_x, stats_y + 95))
         
         # Level
-        level_label = self.font_small.render("LEVEL", True, self.TEXT_COLOR)
-        level_value = self.font_medium.render(str(game_engine.level), True, self.TEXT_COLOR)
+        level_label = self._render_text(self.font_small, "LEVEL", self.TEXT_COLOR)
+        level_value = self._render_text(self.font_medium, str(game_engine.level), self.TEXT_COLOR)
         self.screen.blit(level_label, (stats_x, stats_y + 140))
         self.screen.blit(level_value, (stats_x, stats_y + 165))
     
@@ -243,57 +346,53 @@ class Renderer:
             opponent_state (dict): Opponent's game state
         """
         # Draw in bottom right corner
-        mini_cell_size = 10
-        mini_width = Board.WIDTH * mini_cell_size
-        mini_height = Board.HEIGHT * mini_cell_size
-        mini_x = self.board_x + self.BOARD_WIDTH + 20
-        mini_y = self.WINDOW_HEIGHT - mini_height - 50
+        mini_x = self.mini_x
+        mini_y = self.mini_y
         
         # Label
-        label = self.font_small.render("OPPONENT", True, self.TEXT_COLOR)
+        label = self._render_text(self.font_small, "OPPONENT", self.TEXT_COLOR)
         self.screen.blit(label, (mini_x, mini_y - 25))
         
         # Border
-        border_rect = pygame.Rect(mini_x - 1, mini_y - 1, mini_width + 2, mini_height + 2)
+        border_rect = pygame.Rect(mini_x - 1, mini_y - 1, self.MINI_WIDTH + 2, self.MINI_HEIGHT + 2)
         pygame.draw.rect(self.screen, self.BORDER_COLOR, border_rect, 1)
         
-        # Draw mini board
-        if 'board' in opponent_state:
-            board = opponent_state['board']
-            for row in range(min(len(board), Board.HEIGHT)):
-                for col in range(min(len(board[0]), Board.WIDTH)):
-                    if board[row][col] is not None:
-                        x = mini_x + col * mini_cell_size
-                        y = mini_y + row * mini_cell_size
-                        cell_rect = pygame.Rect(x, y, mini_cell_size, mini_cell_size)
-                        pygame.draw.rect(self.screen, board[row][col], cell_rect)
+        # Draw mini board (packed color ids, row by row)
+        board = opponent_state.get('board')
+        if board is not None and len(board) >= Board.HEIGHT * Board.WIDTH:
+            if board != self._opponent_board:
+                color_ids = np.frombuffer(board, dtype=np.uint8, count=Board.HEIGHT * Board.WIDTH)
+                pixels = self._mini_palette[color_ids.reshape(Board.HEIGHT, Board.WIDTH)]
+                pixels = pixels.repeat(self.MINI_CELL_SIZE, axis=0).repeat(self.MINI_CELL_SIZE, axis=1)
+                # surfarray is indexed [x][y]
+                pygame.surfarray.blit_array(self._opponent_surface, pixels.transpose(1, 0, 2))
+                self._opponent_board = board
+            self.screen.blit(self._opponent_surface, (mini_x, mini_y))
     
     def _draw_game_over(self):
         """Draw game over overlay."""
-        overlay = pygame.Surface((self.WINDOW_WIDTH, self.WINDOW_HEIGHT))
-        overlay.set_alpha(200)
-        overlay.fill((0, 0, 0))
-        self.screen.blit(overlay, (0, 0))
+        self.screen.blit(self._overlay, (0, 0))
         
-        text = self.font_large.render("GAME OVER", True, (255, 0, 0))
+        text = self._render_text(self.font_large, "GAME OVER", (255, 0, 0))
         text_rect = text.get_rect(center=(self.WINDOW_WIDTH // 2, self.WINDOW_HEIGHT // 2))
         self.screen.blit(text, text_rect)
         
-        restart = self.font_small.render("Press R to restart", True, self.TEXT_COLOR)
+        restart = self._render_text(self.font_small, "Press R to restart", self.TEXT_COLOR)
         restart_rect = restart.get_rect(center=(self.WINDOW_WIDTH // 2, self.WINDOW_HEIGHT // 2 + 50))
         self.screen.blit(restart, restart_rect)
     
     def _draw_pause(self):
         """Draw pause overlay."""
-        overlay = pygame.Surface((self.WINDOW_WIDTH, self.WINDOW_HEIGHT))
-        overlay.set_alpha(200)
-        overlay.fill((0, 0, 0))
-        self.screen.blit(overlay, (0, 0))
+        self.screen.blit(self._overlay, (0, 0))
         
-        text = self.font_large.render("PAUSED", True, self.TEXT_COLOR)
+        text = self._render_text(self.font_large, "PAUSED", self.TEXT_COLOR)
         text_rect = text.get_rect(center=(self.WINDOW_WIDTH // 2, self.WINDOW_HEIGHT // 2))
         self.screen.blit(text, text_rect)
     
+    def invalidate(self):
+        """Force the next render() to redraw, e.g. after the window was uncovered."""
+        self._last_frame = None
+    
     def cleanup(self):
         """Cleanup pygame resources."""
         pygame.quit()